@@ -1,59 +1,121 @@
-import json
+import os
+import types
+from functools import lru_cache
 from pathlib import Path
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
 # Global configuration instance
 _global_config = None
 
+@lru_cache(maxsize=None)
+def _load_json_cached(path_str: str, mtime_ns: int) -> types.MappingProxyType:
+    """Load and parse a JSON config file, caching on (path, mtime).
+
+    Repeated instantiations of BaseConfig/MCPConfig reuse the parsed dict
+    instead of re-reading and re-parsing the file; editing the file bumps
+    the mtime and naturally invalidates the cache entry. The result is
+    wrapped in a read-only proxy so shared instances can't mutate it.
+    """
+    # One read_bytes syscall plus a single parse; orjson when available
+    return types.MappingProxyType(_json_loads(Path(path_str).read_bytes()))
+
+def _load_config(config_path: Path) -> types.MappingProxyType:
+    return _load_json_cached(str(config_path), os.stat(config_path).st_mtime_ns)
+
+# Top-level config keys materialized as slot attributes at load time so the
+# agent hot loop reads them as C-level slot lookups instead of going through
+# __getattr__ -> dict lookup on every access.
+def _build_paths_cache(data: types.MappingProxyType) -> types.MappingProxyType:
+    """Resolve every known path type once; _data never changes after load.
+
+    Values are Path instances so callers don't re-wrap them per use.
+    """
+    paths = data.get("paths", {})
+    case_name = data.get("case_name", "")
+    base_dir = paths.get("base_dir", "test/backup")
+    return types.MappingProxyType({
+        "root_dir": Path(base_dir) / case_name / paths.get("root_dir", "Export"),
+        "attached_artifact_dir": Path(base_dir) / case_name / paths.get("attached_artifact_dir", "Export/Attachments"),
+        "nav_path": Path(base_dir) / paths.get("nav_path", "nav_data") / f"{case_name}.json",
+        "ground_truth_path": Path(paths.get("ground_truth_dir", "ground_truth")) / f"{case_name}_answers.json",
+        "knowledge_data_path": Path("test/knowledge/axiom_artifact_info_flat.json"),
+        "log_dir": Path(paths.get("log_dir", "logs")),
+        "output_dir": Path(paths.get("output_dir", "output")),
+    })
+
+_BASE_CONFIG_KEYS = (
+    "case_name",
+    "models",
+    "paths",
+    "embed_image_model_name",
+    "embed_text_model_name",
+    "milvus_uri",
+    "milvus_db_name",
+    "milvus_token",
+    "recursion_limit",
+    "knowledge_data_path",
+)
+
 class BaseConfig:
+    __slots__ = ("_path", "_data", "_paths_cache") + _BASE_CONFIG_KEYS
+
     def __init__(self, path: str | Path = "config.json"):
         # Get the directory where config.py is located
         config_dir = Path(__file__).parent
         # Join with the config filename
         config_path = config_dir / path
         object.__setattr__(self, "_path", config_path)
-        with self._path.open(encoding="utf-8") as f:
-            object.__setattr__(self, "_data", json.load(f))   # 안전하게 저장
+        object.__setattr__(self, "_data", _load_config(config_path))
+        # Materialize known top-level keys as slot attributes
+        for key in _BASE_CONFIG_KEYS:
+            if key in self._data:
+                object.__setattr__(self, key, self._data[key])
+        object.__setattr__(self, "_paths_cache", _build_paths_cache(self._data))
 
-    # Read-only
+    # Read-only fallback for keys not covered by __slots__
     def __getattr__(self, name):
         try:
             return self._data[name]
         except KeyError as e:
             raise AttributeError(name) from e
-            
+
+    # Path types that must exist as directories before the agent runs
+    _DIR_KEYS = ("log_dir", "output_dir")
+
+    def get(self, name, default=None):
+        """Return a top-level config value, or ``default`` if absent."""
+        return self._data.get(name, default)
+
+    def ensure_dirs(self):
+        """Create the configured log/output directories if missing."""
+        for key in self._DIR_KEYS:
+            self._paths_cache[key].mkdir(parents=True, exist_ok=True)
+
     def get_path(self, path_type):
         """
-        Construct a path based on the case name and path type.
-        
+        Look up a path based on the case name and path type.
+
+        All known path types are resolved once at load time, so this is a
+        single dict lookup per call.
+
         Args:
-            path_type: Type of path to construct (e.g., 'root_dir', 'nav_path')
-            
+            path_type: Type of path to look up (e.g., 'root_dir', 'nav_path')
+
         Returns:
-            Constructed path as a string
+            The resolved Path for known types, the raw config value for
+            direct keys, or None if unknown
         """
-        paths = self._data.get("paths", {})
-        case_name = self._data.get("case_name", "")
-        
-        if path_type == "root_dir":
-            return f"{paths.get('base_dir', 'test/backup')}/{case_name}/{paths.get('root_dir', 'Export')}"
-        elif path_type == "attached_artifact_dir":
-            return f"{paths.get('base_dir', 'test/backup')}/{case_name}/{paths.get('attached_artifact_dir', 'Export/Attachments')}"
-        elif path_type == "nav_path":
-            return f"{paths.get('base_dir', 'test/backup')}/{paths.get('nav_path', 'nav_data')}/{case_name}.json"
-        elif path_type == "ground_truth_path":
-            return f"{paths.get('ground_truth_dir', 'ground_truth')}/{case_name}_answers.json"
-        elif path_type == "knowledge_data_path":
-            return "test/knowledge/axiom_artifact_info_flat.json"
-        elif path_type == "log_dir":
-            return paths.get("log_dir", "logs")
-        else:
-            # Return the direct path from config if it exists
-            if path_type in self._data:
-                return self._data[path_type]
-            # Or from paths section
-            elif path_type in paths:
-                return paths[path_type]
-            return None
+        path = self._paths_cache.get(path_type)
+        if path is not None:
+            return path
+        # Fall back to direct config keys, then the paths section
+        if path_type in self._data:
+            return self._data[path_type]
+        return self._data.get("paths", {}).get(path_type)
 
     @property
     def data(self):
@@ -61,21 +123,28 @@ class BaseConfig:
         return self._data
 
 class MCPConfig:
+    # Server names are user-defined, so they stay in _data and go through
+    # __getattr__; the slots only pin the fixed instance layout.
+    __slots__ = ("_path", "_data")
+
     def __init__(self, path: str | Path = "mcp_servers.json"):
         # Get the directory where config.py is located
         config_dir = Path(__file__).parent
         # Join with the config filename
         config_path = config_dir / path
         object.__setattr__(self, "_path", config_path)
-        with self._path.open(encoding="utf-8") as f:
-            object.__setattr__(self, "_data", json.load(f))
+        object.__setattr__(self, "_data", _load_config(config_path))
 
     def __getattr__(self, name):
         try:
             return self._data[name]
         except KeyError as e:
             raise AttributeError(name) from e
-            
+
+    def get(self, name, default=None):
+        """Return a top-level config value, or ``default`` if absent."""
+        return self._data.get(name, default)
+
     @property
     def data(self):
         """Return the complete config data"""
@@ -1,44 +1,119 @@
+import atexit
 import logging
+import logging.handlers
+import queue
+import threading
+import time
 from pathlib import Path
-import logging.config
-from config import BaseConfig 
-from datetime import datetime
+
+# Listener draining the log queue on a background thread; kept at module
+# scope so it can be stopped (and its handlers flushed) at shutdown.
+_queue_listener = None
+
+# Set once the root logger has been configured by the entry point; later
+# get_logger calls are then plain logging.getLogger lookups. Calls that
+# carry no session_id/case_name (tool modules at import time) never latch
+# this, so the entry point's configuration still wins — matching the old
+# last-call-wins dictConfig behaviour.
+_configured = False
+
+def _stop_listener():
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+_LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+_LOG_DATEFMT = "%Y-%m-%dT%H:%M:%S"
+
+class _BufferedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """RotatingFileHandler with a 64KB write buffer.
+
+    Size-based rotation keeps the per-record rollover check to an integer
+    compare (TimedRotatingFileHandler recomputes the rollover time for
+    every record); the daily rotation is handled by a midnight thread.
+
+    The stock StreamHandler flushes after every record, turning each log
+    line into a syscall. Records at WARNING and above still flush
+    immediately so errors hit disk right away; everything else is batched
+    by the buffer.
+    """
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=65536,
+                    encoding=self.encoding, errors=self.errors)
+
+    def emit(self, record):
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            msg = self.format(record)
+            self.stream.write(msg + self.terminator)
+            if record.levelno >= logging.WARNING:
+                self.stream.flush()
+        except Exception:
+            self.handleError(record)
+
+def _midnight_rotator(handler: logging.handlers.RotatingFileHandler) -> None:
+    """Roll the log file over at each local midnight."""
+    while True:
+        now = time.localtime()
+        seconds_today = now.tm_hour * 3600 + now.tm_min * 60 + now.tm_sec
+        time.sleep(86400 - seconds_today + 1)
+        handler.acquire()
+        try:
+            handler.doRollover()
+        except Exception:
+            pass
+        finally:
+            handler.release()
 
 def get_logger(name: str, log_dir: Path, level: str = "INFO", session_id: str = None, case_name: str = None) -> logging.Logger:
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    global _queue_listener, _configured
+
+    if _configured:
+        return logging.getLogger(name)
+
+    timestamp = time.strftime("%Y%m%d_%H%M%S", time.localtime())
     log_filename = f"logs_{timestamp}_{case_name}_{session_id}.log"
 
     log_dir.mkdir(parents=True, exist_ok=True)
 
-    logging.config.dictConfig({
-        "version": 1,
-        "disable_existing_loggers": False,
-        "formatters": {
-            "standard": {
-                "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-                "datefmt": "%Y-%m-%dT%H:%M:%S",
-            }
-        },
-        "handlers": {
-            "console": {
-                "class": "logging.StreamHandler",
-                "formatter": "standard",
-                "level": level,
-            },
-            "file": {
-                "class": "logging.handlers.TimedRotatingFileHandler",
-                "formatter": "standard",
-                "when": "midnight",
-                "backupCount": 14,
-                "filename": str(log_dir/log_filename),
-                "encoding": "utf-8",
-                "level": "DEBUG",
-            },
-        },
-        "root": {
-            "handlers": ["console", "file"],
-            "level": level,
-        },
-    })
+    formatter = logging.Formatter(_LOG_FORMAT, datefmt=_LOG_DATEFMT)
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+    console_handler.setLevel(level)
+
+    file_handler = _BufferedRotatingFileHandler(
+        str(log_dir / log_filename), maxBytes=100_000_000, backupCount=14, encoding="utf-8"
+    )
+    file_handler.setFormatter(formatter)
+    file_handler.setLevel(logging.DEBUG)
+    threading.Thread(
+        target=_midnight_rotator, args=(file_handler,), daemon=True
+    ).start()
+
+    # Route every record through a queue so the emitting (async) code never
+    # blocks on console or file I/O; the listener drains it on its own thread.
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.handlers.clear()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    _stop_listener()
+    _queue_listener = logging.handlers.QueueListener(
+        log_queue, console_handler, file_handler, respect_handler_level=True
+    )
+    _queue_listener.start()
+    atexit.register(_stop_listener)
+    # Only the real configuring call — identified by the session/case
+    # naming it supplies — freezes the configuration. Import-time calls
+    # from tool modules set up a usable fallback but stay replaceable.
+    if session_id is not None or case_name is not None:
+        _configured = True
 
     return logging.getLogger(name)
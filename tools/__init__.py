@@ -1,38 +1,54 @@
+import importlib
 import logging
 
 logger = logging.getLogger(__name__)
 
-try:
-    from .basic_df_tools import df_tools
-except ImportError:
-    df_tools = []
-    logger.warning("basic_df_tools unavailable")
+# Tool groups and the submodules providing them. Imports are deferred via
+# PEP 562 module __getattr__ so entry points that never run the agent
+# (e.g. --list-mcp-tools) don't pay the import cost of heavy SDKs like
+# pymilvus or googlemaps.
+_TOOL_MODULES = {
+    "df_tools": ".basic_df_tools",
+    "web_tools": ".basic_web_tools",
+    "forensic_tools": ".basic_forensic_tools",
+    "google_maps_tools": ".google_maps_tools",
+    "milvus_tools": ".milvus_tools",
+}
 
-try:
-    from .basic_web_tools import web_tools
-except ImportError:
-    web_tools = []
-    logger.warning("basic_web_tools unavailable")
+def _load_tool_group(name):
+    cached = globals().get(name)
+    if cached is not None:
+        return cached
+    try:
+        module = importlib.import_module(_TOOL_MODULES[name], __package__)
+        tool_group = getattr(module, name)
+    except ImportError:
+        logger.warning("%s unavailable", _TOOL_MODULES[name].lstrip("."))
+        tool_group = []
+    globals()[name] = tool_group
+    return tool_group
 
-try:
-    from .basic_forensic_tools import forensic_tools
-except ImportError:
-    forensic_tools = []
-    logger.warning("basic_forensic_tools unavailable")
+def _build_basic_tools():
+    basic_tools = {}
+    basic_tools["df_tools"] = _load_tool_group("df_tools") + _load_tool_group("forensic_tools")
+    basic_tools["web_tools"] = _load_tool_group("web_tools") + _load_tool_group("google_maps_tools")
+    basic_tools["milvus_tools"] = _load_tool_group("milvus_tools")
+    return basic_tools
 
-try:
-    from .google_maps_tools import google_maps_tools
-except ImportError:
-    google_maps_tools = []
-    logger.warning("google_maps_tools unavailable")
-
-try:
-    from .milvus_tools import milvus_tools
-except ImportError:
-    milvus_tools = []
-    logger.warning("milvus_tools unavailable")
-
-basic_tools = {}
-basic_tools["df_tools"] = df_tools + forensic_tools
-basic_tools["web_tools"] = web_tools + google_maps_tools
-basic_tools["milvus_tools"] = milvus_tools
+def __getattr__(name):
+    if name in _TOOL_MODULES:
+        return _load_tool_group(name)
+    if name == "basic_tools":
+        basic_tools = _build_basic_tools()
+        globals()["basic_tools"] = basic_tools
+        return basic_tools
+    if name == "basic_tools_flat":
+        # The tool set never changes at runtime, so flatten it once
+        basic_tools_flat = tuple(
+            tool
+            for group in __getattr__("basic_tools").values()
+            for tool in (group if isinstance(group, list) else [group])
+        )
+        globals()["basic_tools_flat"] = basic_tools_flat
+        return basic_tools_flat
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
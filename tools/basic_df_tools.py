@@ -1,7 +1,8 @@
-import json 
+import json
 import os
 import glob
 import re
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from setup_logging import get_logger
@@ -9,11 +10,28 @@ from config import BaseConfig
 from config import get_global_config
 from langchain.tools import tool
 import subprocess
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import re2  # Google RE2: linear-time DFA matching, no backtracking
+except ImportError:
+    re2 = None
+
+try:
+    import pyarrow  # noqa: F401 - enables pandas' multithreaded CSV parser
+    _CSV_READ_KWARGS = {"engine": "pyarrow"}
+except ImportError:
+    _CSV_READ_KWARGS = {"low_memory": False}
 
 config = get_global_config()
 
 logger = get_logger(__name__, Path("logs"), level="INFO")
 
+# Extensions treated as readable text; O(1) hash lookup on the splitext
+# suffix instead of a per-call endswith over a tuple literal
+_TEXT_EXTS = frozenset({'.txt', '.csv', '.json', '.md', '.log', '.html', '.xml', '.js', '.py', '.cfg', '.conf'})
+
 @tool()
 def get_df_info(df: pd.DataFrame) -> str:
     """Return information about a DataFrame as a string."""
@@ -49,11 +67,30 @@ def _resolve_path(p: str) -> str:
     joined = os.path.join(config.get_path("root_dir"), p)
     return joined
 
+# Parsed-CSV cache: LLM tool calls hit the same files over and over within a
+# session, and pandas parsing dominates those calls. Keyed on
+# (path, mtime_ns, size) so an edited file is re-read; bounded LRU so memory
+# stays capped. (lru_cache can't be used: DataFrames aren't hashable.)
+_CSV_CACHE: OrderedDict = OrderedDict()
+_CSV_CACHE_MAX = 16
+
 def _read_csv(p: str) -> pd.DataFrame:
     file_path = _resolve_path(p)
     if not os.path.exists(file_path):
         return f"Error: File not found at path: {file_path}"
-    return pd.read_csv(file_path, low_memory=False)
+    st = os.stat(file_path)
+    key = (file_path, st.st_mtime_ns, st.st_size)
+    df = _CSV_CACHE.get(key)
+    if df is None:
+        df = pd.read_csv(file_path, **_CSV_READ_KWARGS)
+        _CSV_CACHE[key] = df
+        if len(_CSV_CACHE) > _CSV_CACHE_MAX:
+            _CSV_CACHE.popitem(last=False)
+    else:
+        _CSV_CACHE.move_to_end(key)
+    # Callers assign into columns (fillna etc.), so hand out a copy to keep
+    # the cached frame pristine
+    return df.copy()
 
 def _read_json(p: str) -> dict:
     logger.info(f"Reading JSON file from: {p}")
@@ -80,7 +117,16 @@ def sort_values(csv_path: str, column_name: str, ascending: bool = True) -> str:
 Before using this function, you must call the show_columns function to check the exact column names and ensure that a valid column is provided as the sorting criterion."""
     df = _read_csv(csv_path)
     df[column_name] = df[column_name].fillna('')
-    answer = df.sort_values(column_name, ascending=ascending).to_csv(index=False)
+    # argsort the key column and materialize only the rows we return:
+    # sorting and serializing the whole frame allocated roughly twice the
+    # file size to produce output nobody reads past the top
+    order = df[column_name].argsort(kind='stable').to_numpy()
+    if not ascending:
+        order = order[::-1]
+    truncated = len(order) > 1000
+    answer = df.iloc[order[:1000]].to_csv(index=False)
+    if truncated:
+        answer += "\n⚠️ Output truncated to first 1000 rows."
     logger.info(f"sort_values: {answer}")
     return answer
 
@@ -98,10 +144,19 @@ Before using this function, you must call the show_columns function to check the
 def find_attachments() -> str:
     """Searches for all attachments in the attachments directory and returns a list of their paths."""
     base_dir = config.get_path("attached_artifact_dir")
-    all_files = glob.glob(os.path.join(base_dir, "*"))
     # Remove names if they contain "Carved" as we will not get useful information from them
-    # also check if the file has a text extension
-    all_files = [file for file in all_files if file.endswith(('.txt', '.csv', '.json', '.md', '.log', '.html', '.xml', '.js', '.py', '.cfg', '.conf')) and "Carved" not in file]
+    # also check if the file has a text extension. scandir reuses the stat
+    # info from the directory read, so no per-entry stat syscall.
+    try:
+        with os.scandir(base_dir) as entries:
+            all_files = [
+                entry.path for entry in entries
+                if entry.is_file()
+                and os.path.splitext(entry.name)[1].lower() in _TEXT_EXTS
+                and "Carved" not in entry.name
+            ]
+    except FileNotFoundError:
+        all_files = []
     logger.info(f"find_attachments: {all_files}")
     return all_files
 
@@ -109,42 +164,41 @@ def find_attachments() -> str:
 def get_relevant_attachments_with_keyword(keyword: str) -> str:
     """Searches for the given keyword in all attachments and returns a list of (attachment filename, count) for files with at least one match."""
     base_dir = config.get_path("attached_artifact_dir")
-    # Get all files in the attachments directory
-    all_files = glob.glob(os.path.join(base_dir, "*"))
-    results = []
-    pattern = re.compile(re.escape(keyword), re.IGNORECASE)
-    
-    for file_path in all_files:
-        if not os.path.isfile(file_path):
-            continue
-            
+    # Get all files in the attachments directory (file check comes free
+    # with the scandir entry, so _scan doesn't need to stat again)
+    try:
+        with os.scandir(base_dir) as entries:
+            all_files = [entry.path for entry in entries if entry.is_file()]
+    except FileNotFoundError:
+        all_files = []
+    # Lowercase both sides once: bytes.count on a lowered buffer uses
+    # CPython's SIMD substring search and avoids the slow re.IGNORECASE path
+    needle = keyword.lower()
+    needle_bytes = needle.encode("utf-8")
+
+    def _scan(file_path):
         file_name = os.path.basename(file_path)
-        count = 0
         # Match in filename
-        filename_matches = len(pattern.findall(file_name))
-        count += filename_matches
-        
+        count = file_name.lower().count(needle)
+
         # Try to open and read the file for content matches
         try:
-            # First check if it's likely a text file
-            # Simple check based on extension - can be improved
-            _, ext = os.path.splitext(file_name)
-            text_extensions = ['.txt', '.csv', '.json', '.md', '.log', '.html', '.xml', '.js', '.py', '.cfg', '.conf']
-            
             # Skip binary files to avoid encoding errors and improve performance
-            if ext.lower() in text_extensions:
-                # Process the file line by line to handle large files efficiently
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    for line in f:
-                        content_matches = len(pattern.findall(line))
-                        count += content_matches
-        except Exception as e:
-            # Silently skip files that can't be read as text
+            if os.path.splitext(file_name)[1].lower() in _TEXT_EXTS:
+                # Whole-file binary read: the GIL is released during read()
+                # and inside bytes.lower/bytes.count, so threads overlap
+                with open(file_path, 'rb') as f:
+                    count += f.read().lower().count(needle_bytes)
+        except Exception:
+            # Silently skip files that can't be read
             pass
-        
-        if count > 0:
-            results.append({"filename": file_name, "count": count})
-    
+
+        return {"filename": file_name, "count": count} if count > 0 else None
+
+    # The per-file scans are independent and I/O bound
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        results = [r for r in executor.map(_scan, all_files) if r]
+
     # Sort results by match count in descending order
     results = sorted(results, key=lambda x: x["count"], reverse=True)
     
@@ -164,10 +218,13 @@ def get_relevant_rows_with_keyword(csv_path: str, keyword: str) -> str:
     df = _read_csv(csv_path)
     df = df.fillna("")
     df = df.astype(str)
-    mask = df.apply(
-        lambda row: row.str.contains(keyword, case=False, na=False).any(),
-        axis=1
-    )
+    # One vectorized substring scan per column instead of a Python lambda per
+    # row; lowercasing both sides keeps pandas on the fast literal path
+    # rather than the re.IGNORECASE code path.
+    needle = keyword.lower()
+    mask = np.zeros(len(df), dtype=bool)
+    for column in df.columns:
+        mask |= df[column].str.lower().str.contains(needle, regex=False, na=False).to_numpy()
     # 5. Filter and serialize to CSV
     filtered = df[mask]
 
@@ -182,19 +239,131 @@ def get_relevant_rows_with_keyword(csv_path: str, keyword: str) -> str:
     logger.info(f"get_relevant_rows_with_keyword: {answer}")
     return answer
 
+# Trigram shortlist index: agent sessions grep the same corpus over and
+# over, so remember which 3-byte grams each CSV contains and skip files
+# that cannot possibly hold the keyword. In-memory per process; entries
+# are invalidated by (mtime_ns, size). Files above the size cap are left
+# unindexed (their gram sets would cost more than the scan they save).
+_TRIGRAM_INDEX = {}
+_TRIGRAM_MAX_FILE_BYTES = 32 * 1024 * 1024
+
+# ERE metacharacters: keywords without any of these are plain literals and
+# can take the fixed-string search path (forensic queries are full of IPs,
+# paths and registry keys whose dots would otherwise become wildcards)
+_REGEX_META_RE = re.compile(r'[.*+?()|\\\[\]{}^$]')
+
+def _file_trigrams(file_path: str):
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    if st.st_size > _TRIGRAM_MAX_FILE_BYTES:
+        return None
+    cached = _TRIGRAM_INDEX.get(file_path)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read().lower()
+    except OSError:
+        return None
+    grams = frozenset(data[i:i + 3] for i in range(len(data) - 2))
+    _TRIGRAM_INDEX[file_path] = (st.st_mtime_ns, st.st_size, grams)
+    return grams
+
+def _trigram_shortlist(keyword: str, csv_files: list) -> list:
+    """Drop files whose trigram set can't cover the keyword's trigrams.
+
+    Regex-looking or sub-3-char keywords get no useful gram filter and
+    pass through untouched, as do files with no index entry.
+    """
+    if len(keyword) < 3 or _REGEX_META_RE.search(keyword):
+        return csv_files
+    kw = keyword.lower().encode('utf-8')
+    qgrams = {kw[i:i + 3] for i in range(len(kw) - 2)}
+    shortlist = []
+    for file_path in csv_files:
+        grams = _file_trigrams(file_path)
+        if grams is None or qgrams <= grams:
+            shortlist.append(file_path)
+    return shortlist
+
+def _list_csv_files(root_dir) -> list:
+    # os.walk is scandir-based: directory entries carry their type, so the
+    # listing costs one getdents per directory with no per-file stat
+    return [
+        os.path.join(dirpath, name)
+        for dirpath, _, names in os.walk(str(root_dir))
+        for name in names if name.endswith('.csv')
+    ]
+
+def _scan_csvs_with_re2(keyword: str, csv_files: list) -> list:
+    """Scan the given CSVs with RE2, returning grep-style rows.
+
+    Produces the same [file://path, Lno, text] rows as the grep fallback,
+    one row per matching line, capped just above the display limit.
+    """
+    pattern = re2.compile(keyword.encode("utf-8"), re2.IGNORECASE)
+    results = []
+    for file_path in csv_files:
+        try:
+            with open(file_path, 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            logger.warning(f"Could not read {file_path}: {e}")
+            continue
+
+        last_lineno = -1
+        for match in pattern.finditer(data):
+            start = match.start()
+            lineno = data.count(b'\n', 0, start) + 1
+            if lineno == last_lineno:
+                # grep reports each matching line once
+                continue
+            last_lineno = lineno
+            line_start = data.rfind(b'\n', 0, start) + 1
+            line_end = data.find(b'\n', start)
+            if line_end == -1:
+                line_end = len(data)
+            text = data[line_start:line_end].decode('utf-8', 'ignore').strip()
+            results.append([f"file://{file_path}", f"L{lineno}", text])
+            if len(results) > 60:
+                # Already past the display cap; no point scanning further
+                return results
+    return results
+
 @tool("keyword_search_in_all_data")
 def keyword_search_in_all_data(keyword: str) -> str:
     """Searches for the given keyword in all data files and returns a list of (csv filename, count) for files with at least one match. The search uses the grep command, allowing the use of grep-compatible patterns such as | (alternation) and other regular expressions for advanced keyword matching."""
 
-    # Find all CSV files
-    csv_files = glob.glob(os.path.join(config.get_path("root_dir"), '*.csv'))
-    # logger.info(f"Found {len(csv_files)} CSV files in {config.get_path("root_dir")}")
-    logger.info(f"Looking for keyword: {keyword} in {len(csv_files)} CSV files")
-    results = []
+    root_dir = config.get_path("root_dir")
+    logger.info(f"Looking for keyword: {keyword} in CSV files under {root_dir}")
+    results = None
 
-    for file_path in csv_files:
+    # Literal keywords only need to visit files whose trigram set covers
+    # the query's trigrams — usually a handful out of the whole corpus
+    csv_files = _trigram_shortlist(keyword, _list_csv_files(root_dir))
+    if not csv_files:
+        return "No matches found."
+
+    if re2 is not None:
+        # In-process DFA scan: no subprocess round trip, and no
+        # backtracking blowup on alternation-heavy patterns
         try:
-            cmd = ['grep', '-n', '-E', '-i', keyword, file_path]
+            results = _scan_csvs_with_re2(keyword, csv_files)
+        except Exception as e:
+            logger.warning(f"re2 scan failed ({e}), falling back to grep")
+
+    if results is None:
+        results = []
+        try:
+            # One grep over the shortlist: a single fork/exec instead of
+            # one subprocess per file (-H keeps filenames in the output
+            # even when the shortlist is a single file). Literal keywords
+            # use -F so grep stays on its Boyer-Moore path and a stray
+            # metacharacter can't trigger backtracking across the corpus.
+            matcher = '-F' if _REGEX_META_RE.search(keyword) is None else '-E'
+            cmd = ['grep', '-HIn', matcher, '-i', keyword] + csv_files
             completed_process = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
 
             lines = completed_process.stdout.strip().split('\n') if completed_process.stdout else []
@@ -211,7 +380,7 @@ def keyword_search_in_all_data(keyword: str) -> str:
                     logger.warning(f"Failed to parse line: {line} - {parse_error}")
 
         except Exception as e:
-            logger.error(f"Error searching file {file_path}: {str(e)}")
+            logger.error(f"Error searching files under {root_dir}: {str(e)}")
 
     # Limit to 50
     if len(results) > 50:
@@ -279,25 +448,30 @@ def keyword_search_in_all_data(keyword: str) -> str:
 def filter_by_date_or_time(csv_path: str, column_name: str, start_date: str, end_date: str) -> str:
     """Filters rows in the CSV file where the specified date column matches either the given start date or end date. Returns matching entries as a CSV string. Write the start and end date in the same format with the csv file."""
     df = _read_csv(csv_path)
-    df[column_name] = df[column_name].fillna('')
-    
-    # 날짜 범위 내의 데이터 필터링
-    filtered_df = df[
-        (df[column_name] >= start_date) & 
-        (df[column_name] < end_date)
-    ]
-    
+    col = df[column_name].fillna('')
+
+    # 날짜 범위 내의 데이터 필터링 — between is one pass / one boolean array
+    filtered_df = df[col.between(start_date, end_date, inclusive='left')]
+
+    # Limit to 1000 characters; estimate how many rows fit in the budget
+    # from a small sample so we never serialize thousands of unused rows
+    truncated = False
+    if len(filtered_df) > 5:
+        sample = filtered_df.iloc[:5].to_csv(index=False)
+        avg_row_bytes = max(1, len(sample) // 5)
+        keep = int(1000 / avg_row_bytes) + 1
+        if keep < len(filtered_df):
+            filtered_df = filtered_df.head(keep)
+            truncated = True
+
     answer = filtered_df.to_csv(index=False)
-    # Limit to 1000
     if len(answer) > 1000:
         answer = answer[:1000]
         truncated = True
-    else:
-        truncated = False
-    
+
     if truncated:
         answer += "\n⚠️ Output truncated to first 1000 rows. Please refine your date range."
-        
+
     logger.info(f"filter_by_date_or_time: {answer}")
     return answer
 
@@ -1,4 +1,7 @@
 import os
+import gzip
+import mmap
+import re
 import subprocess
 try:
     import magic
@@ -15,13 +18,20 @@ logger = get_logger(__name__, Path("logs"), level="INFO")
 
 base_cfg = get_global_config()
 
+# Extensions treated as readable text (hash lookup beats endswith on a tuple)
+_TEXT_EXTS = frozenset({'.txt', '.csv', '.json', '.md', '.log', '.html', '.xml', '.js', '.py', '.cfg', '.conf'})
+
+# Above this size, grep's mmap+SIMD scan beats in-process re; below it,
+# the fork/exec round trip dominates and we search the file ourselves.
+_GREP_FALLBACK_BYTES = 500 * 1024 * 1024
+
 @tool("read_text_file")
 def read_text_file(file_path: str) -> str:
     """Reads the first 5000 characters of a text file in Attachment directory. Use basename for attachments as input. Returns the content as a string."""
     # Normalize path separators to the current OS style
-   
+
     #check if the file is a text file
-    if not file_path.endswith(('.txt', '.csv', '.json', '.md', '.log', '.html', '.xml', '.js', '.py', '.cfg', '.conf')):
+    if os.path.splitext(file_path)[1].lower() not in _TEXT_EXTS:
         return "The file is not a readable text file."
    
     file_path = os.path.normpath(file_path)
@@ -36,7 +46,10 @@ def read_text_file(file_path: str) -> str:
         if file_path.endswith('.json'):
             return json.load(open(attachment_path, 'r', encoding='utf-8-sig'))
         else:
-            return open(attachment_path, 'r').read()[:5000]
+            # read(5000) keeps I/O bounded regardless of file size;
+            # .read()[:5000] would pull the whole file into memory first
+            with open(attachment_path, 'r', encoding='utf-8', errors='ignore') as f:
+                return f.read(5000)
     
     return f"Could not find file: {file_path}. The file may be in the attachments directory {base_dir}."
 
@@ -49,18 +62,42 @@ def search_log_file_with_keywords(file_path: str, keywords: str) -> str:
     """
     if not file_path.endswith(('.log', '.evtx', 'ps1', 'psd1', '.gz', '.zip', '.7z', '.tar', '.rar')):
         return "The file is not a readable log file."
-    import subprocess
     file_path = os.path.normpath(file_path)
     try:
+        pattern = re.compile(keywords.encode('utf-8', 'ignore'), re.IGNORECASE)
+    except re.error as e:
+        return f"Invalid keyword pattern: {e}"
+    try:
+        matches = []
         if file_path.endswith('.log.gz'):
-            cmd = ['zgrep', '-H', '-i', '-E', keywords, file_path]
-        else:
+            # Stream-decompress instead of forking zgrep
+            with gzip.open(file_path, 'rb') as f:
+                for line in f:
+                    if pattern.search(line):
+                        matches.append(f"{file_path}:{line.decode('utf-8', 'replace').rstrip()}")
+        elif os.path.getsize(file_path) > _GREP_FALLBACK_BYTES:
             cmd = ['grep', '-i', '-E', keywords, file_path]
-        completed_process = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        if completed_process.returncode == 0 and completed_process.stdout:
-            return completed_process.stdout
-        else:
+            completed_process = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            if completed_process.returncode == 0 and completed_process.stdout:
+                return completed_process.stdout
             return f"No matches found for '{keywords}' in {file_path}."
+        elif os.path.getsize(file_path) > 0:
+            # mmap + finditer searches in-process without the fork/exec
+            # and pipe overhead of a grep subprocess per call
+            with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                last_start = -1
+                for m in pattern.finditer(mm):
+                    start = mm.rfind(b'\n', 0, m.start()) + 1
+                    if start == last_start:
+                        continue  # several hits on one line
+                    last_start = start
+                    end = mm.find(b'\n', m.end())
+                    if end == -1:
+                        end = len(mm)
+                    matches.append(mm[start:end].decode('utf-8', 'replace'))
+        if matches:
+            return "\n".join(matches)
+        return f"No matches found for '{keywords}' in {file_path}."
     except Exception as e:
         return f"Error searching file: {e}"
 
@@ -1,14 +1,49 @@
 import requests
+from requests.adapters import HTTPAdapter, Retry
 from langchain_core.tools import tool
 from langchain_tavily import TavilySearch
 from bs4 import BeautifulSoup
+try:
+    # Modest-based C parser, far faster than html.parser for text extraction
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+from .ttl_cache import TTLCache
+
+# Investigations re-query the same IPs constantly; caching also keeps us
+# under ip-api.com's 45 req/min free-tier limit.
+_IP_CACHE = TTLCache(maxsize=4096, ttl=3600)
+
+# One session for all web tools: connections (TCP+TLS) are pooled and
+# reused instead of re-handshaking on every call.
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                   "AppleWebKit/537.36 (KHTML, like Gecko) "
+                   "Chrome/124.0 Safari/537.36"),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+})
+_adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32,
+                       max_retries=Retry(total=2, backoff_factor=0.2))
+_SESSION.mount("https://", _adapter)
+_SESSION.mount("http://", _adapter)
+
+# (connect, read) timeouts — an unresponsive server must not stall the agent
+_TIMEOUT = (3, 10)
+
 @tool("ip_search")
 def ip_search(ip_address: str) -> str:
     """Searches for geographical and network information about a given IP address using the ip-api.com service. The function sends an HTTP GET request to the external API with the specified IP address and returns the API's JSON response. The returned information typically includes the IP's country, region, city, ZIP code, latitude, longitude, timezone, ISP, and organization, among others. If the request fails or an exception occurs, it returns an error object with the failure reason."""
+    cached = _IP_CACHE.get(ip_address)
+    if cached is not None:
+        return cached
     try:
-        response = requests.get(f'http://ip-api.com/json/{ip_address}')
+        response = _SESSION.get(f'http://ip-api.com/json/{ip_address}', timeout=_TIMEOUT)
         if response.status_code == 200:
-            return response.json()
+            result = response.json()
+            _IP_CACHE.set(ip_address, result)
+            return result
         else:
             return {"error": True, "message": f"API request failed with status code: {response.status_code}"}
     except Exception as e:
@@ -23,18 +58,20 @@ def get_website_content(url: str, preserve_tags: bool = False) -> str:
     Returns:
         The content as a string.
     """
-    headers = {
-    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                   "AppleWebKit/537.36 (KHTML, like Gecko) "
-                   "Chrome/124.0 Safari/537.36"),
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.5",
-    }
-    session = requests.Session()
-    session.headers.update(headers)
-    response = session.get(url, headers=headers)
+    response = _SESSION.get(url, timeout=_TIMEOUT)
+
+    if HTMLParser is not None:
+        # Parse the raw bytes: selectolax sniffs the charset itself, so we
+        # also skip requests' .text encoding detection.
+        tree = HTMLParser(response.content)
+        if preserve_tags:
+            return tree.html
+        text = tree.text(separator="\n", strip=True)
+        non_empty_lines = [line for line in text.splitlines() if line.strip()]
+        return "\n".join(non_empty_lines)[:2500]
+
     soup = BeautifulSoup(response.text, 'html.parser')
-    
+
     if preserve_tags:
         # Return the prettified HTML with tags preserved
         return str(soup.prettify())
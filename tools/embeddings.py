@@ -1,5 +1,8 @@
+import functools
 import numpy as np
+import threading
 import torch
+from concurrent.futures import ThreadPoolExecutor
 from sentence_transformers import SentenceTransformer
 from transformers import AutoProcessor, AutoModel, AutoTokenizer
 from PIL import Image
@@ -12,42 +15,67 @@ from typing import Optional
 base_cfg = get_global_config()
 device = "cuda" if torch.cuda.is_available() else "cpu"
 
-# Initialize models only once
+# Initialize models only once; the locks keep the background warm-load
+# thread and a concurrent tool call from double-loading
 text_model = None
 image_model = None
 image_processor = None
 image_tokenizer = None
+_text_model_lock = threading.Lock()
+_image_model_lock = threading.Lock()
 
 def get_text_model():
     global text_model
     if text_model is None:
-        text_model = SentenceTransformer(base_cfg.embed_text_model_name)
-        text_model.to(device)
+        with _text_model_lock:
+            if text_model is None:
+                model = SentenceTransformer(base_cfg.embed_text_model_name)
+                model.to(device)
+                if device == "cuda":
+                    # Transformer inference is memory-bandwidth-bound; FP16 halves
+                    # the weight traffic with no measurable retrieval quality loss.
+                    model.half()
+                text_model = model
     return text_model
 
 def get_image_model():
     global image_model, image_processor, image_tokenizer
     if image_model is None:
-        image_processor = AutoProcessor.from_pretrained(base_cfg.embed_image_model_name)
-        image_tokenizer = AutoTokenizer.from_pretrained(base_cfg.embed_image_model_name)
-        image_model = AutoModel.from_pretrained(base_cfg.embed_image_model_name).to(device).eval()
+        with _image_model_lock:
+            if image_model is None:
+                image_processor = AutoProcessor.from_pretrained(base_cfg.embed_image_model_name)
+                image_tokenizer = AutoTokenizer.from_pretrained(base_cfg.embed_image_model_name)
+                dtype = torch.float16 if device == "cuda" else torch.float32
+                image_model = AutoModel.from_pretrained(
+                    base_cfg.embed_image_model_name, torch_dtype=dtype
+                ).to(device).eval()
     return image_model, image_processor, image_tokenizer
 
 
-def text2vector(text: str) -> np.ndarray:
+def texts2vectors(texts: list) -> np.ndarray:
     """
-    Convert text content to a vector using the sentence transformer model.
-    500 characters of text is embedded which should be enough for the agent to decide relevance.
+    Convert a list of texts to vectors in one encode call.
+    A single batched forward pass amortizes tokenization and kernel launch
+    overhead, so callers embedding many snippets should prefer this over
+    looping on text2vector. Returns an (N, D) float32 array.
     """
     model = get_text_model()
-    snippet = text[:500]
-    vec = model.encode(
-        snippet,
+    vecs = model.encode(
+        [text[:500] for text in texts],
+        batch_size=64,
         normalize_embeddings=True,
-        max_length=512,  # safely below common model limits
+        convert_to_numpy=True,
         show_progress_bar=False,
     )
-    return vec.astype(np.float32)
+    return vecs.astype(np.float32)
+
+
+def text2vector(text: str) -> np.ndarray:
+    """
+    Convert text content to a vector using the sentence transformer model.
+    500 characters of text is embedded which should be enough for the agent to decide relevance.
+    """
+    return texts2vectors([text])[0]
 
 EDGE_MAX      = 150      # px ─ covers 16·24·32·48·128 icon tiers  :contentReference[oaicite:0]{index=0}
 ASPECT_TOLER  = 4        # px  ─ allow slight padding
@@ -62,40 +90,75 @@ def is_icon(img: Image.Image, file_bytes: Optional[int] = None) -> bool:
     # 1) too big  →  definitely NOT an icon
     if max(w, h) > EDGE_MAX:
         return False
-    # 2) flat-palette test
-    try:
-        # returns None if > maxcolors unique colours
-        colours = img.convert("RGBA").getcolors(maxcolors=256*256)
-        if colours is None or len(colours) > COLORS_MAX:
+    # 2) flat-palette test (skipped for indexed images — the palette is
+    #    ≤256 entries by construction)
+    if img.mode != "P":
+        try:
+            # Pack each RGBA pixel into one uint32 so uniqueness is a single
+            # C-level pass instead of getcolors' Python tuple list. The 64K
+            # sample cap is belt-and-braces: anything passing the edge check
+            # fits entirely.
+            pixels = np.asarray(img.convert("RGBA"), dtype=np.uint8).view(np.uint32).ravel()
+            if np.unique(pixels[:65536]).size > COLORS_MAX:
+                return False
+        except Exception:
+            # corrupted or huge palette → treat as photo
             return False
-    except Exception:
-        # corrupted or huge palette → treat as photo
-        return False
     # 4) optional file-size guard (icons ≤10 kB on average)     
     if file_bytes is not None and file_bytes > 10_000:
         return False
     return True
 
-def image2vector(image_path: str, filter_icons: bool = True) -> np.ndarray:
+def images2vectors(image_paths: list, filter_icons: bool = True) -> list:
     """
-    Convert an image to a vector using the image model.
+    Convert a list of images to vectors with a single CLIP forward pass.
+    Images are opened in parallel (decoding is I/O bound) and the icon
+    filter runs on the lazily-opened image, so oversized files are rejected
+    on their header dimensions before a full decode. Returns a list aligned
+    with image_paths; filtered or unreadable entries are None.
     """
     model, processor, _ = get_image_model()
-    try:
-        img = Image.open(image_path).convert("RGB")
-        if filter_icons and is_icon(img):
+
+    def _load(path):
+        try:
+            img = Image.open(path)
+            if filter_icons and is_icon(img):
+                return None
+            return img.convert("RGB")
+        except Exception:
             return None
-        with torch.no_grad():
-            inputs = processor(images=img, return_tensors="pt").to(device)
-            vec = model.get_image_features(**inputs)
-        return normalize(vec.cpu().numpy().astype(np.float32))[0]
-    except Exception as e:
-        return None
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        imgs = list(pool.map(_load, image_paths))
+
+    vectors = [None] * len(image_paths)
+    keep = [i for i, img in enumerate(imgs) if img is not None]
+    if not keep:
+        return vectors
+
+    with torch.no_grad():
+        inputs = processor(images=[imgs[i] for i in keep], return_tensors="pt").to(device)
+        inputs["pixel_values"] = inputs["pixel_values"].to(model.dtype)
+        feats = model.get_image_features(**inputs)
+    feats = normalize(feats.cpu().float().numpy().astype(np.float32))
+    for row, i in enumerate(keep):
+        vectors[i] = feats[row]
+    return vectors
+
+
+def image2vector(image_path: str, filter_icons: bool = True) -> np.ndarray:
+    """
+    Convert an image to a vector using the image model.
+    """
+    return images2vectors([image_path], filter_icons=filter_icons)[0]
    
 
+@functools.lru_cache(maxsize=1)
 def get_embedding_dimensions():
     """
     Return the dimensions of the text and image embeddings.
+    Cached: probing the image dimension costs a full CLIP forward pass on
+    a dummy image, and the answer never changes for a loaded model pair.
     """
     text_model = get_text_model()
     text_dim = text_model.get_sentence_embedding_dimension()
@@ -104,20 +167,42 @@ def get_embedding_dimensions():
     with torch.no_grad():
         dummy_image = Image.new("RGB", (512, 512))
         inputs = processor(images=dummy_image, return_tensors="pt").to(device)
+        inputs["pixel_values"] = inputs["pixel_values"].to(model.dtype)
         image_features = model.get_image_features(**inputs)
         image_dim = image_features.shape[-1]
     
     return text_dim, image_dim 
 
+def query2vectors(queries: list) -> np.ndarray:
+    """
+    Convert a list of queries to vectors with one pass through the CLIP
+    text encoder, amortizing tokenization and kernel launches across the
+    batch. Returns an (N, D) float32 array aligned with queries.
+    """
+    model, _, tokenizer = get_image_model()
+    with torch.no_grad():
+        inputs = tokenizer(list(queries), padding=True, return_tensors="pt").to(device)
+        vecs = model.get_text_features(**inputs)
+    return normalize(vecs.cpu().float().numpy().astype(np.float32))
+
+
 def query2vector(query: str) -> np.ndarray:
     """
     Convert a query to a vector using the CLIP model's text processing capabilities.
     This ensures the vector dimensions match those expected by the Milvus image collection.
     """
-    model, _, tokenizer = get_image_model()
-    with torch.no_grad():
-        # Process the text input using the CLIP text encoder
-        inputs = tokenizer([query], padding=True, return_tensors="pt").to(device)
-        vec = model.get_text_features(**inputs)
-    return normalize(vec.cpu().numpy().astype(np.float32))[0]
+    return query2vectors([query])[0]
+
+
+def _warm_load_models():
+    try:
+        get_text_model()
+        get_image_model()
+    except Exception:
+        # A failed warm-up just means the first real call loads lazily
+        pass
+
+# Loading takes seconds; start it now so weights are resident before the
+# first embedding request instead of stalling that agent turn.
+threading.Thread(target=_warm_load_models, daemon=True).start()
 
@@ -2,21 +2,34 @@ import os
 from langchain_core.tools import tool
 import googlemaps
 from dotenv import load_dotenv
+from .ttl_cache import TTLCache
 
 load_dotenv()
 gmaps = googlemaps.Client(key=os.getenv("GOOGLE_API_KEY"))
 
+# Geocoding results are stable and each API call is billed, so repeats
+# within a session are served from cache.
+_GEOCODE_CACHE = TTLCache(maxsize=4096, ttl=3600)
+
 @tool("google_map_keyword_search")
 def google_map_keyword_search(place_str: str) -> str:
     """Searches for the keyword through Google Maps. Returns structured address details including street number, route, locality, administrative regions, country, postal code, and geographic coordinates (latitude/longitude). Also provides a formatted address, place ID, plus code, and location viewport for precise geospatial identification."""
+    cached = _GEOCODE_CACHE.get(place_str)
+    if cached is not None:
+        return cached
     tmp = gmaps.geocode(place_str, language="en")
+    _GEOCODE_CACHE.set(place_str, tmp)
     return tmp
 
 @tool("google_map_location_search")
 def google_map_location_search(lat: float, lng: float) -> str:
     """Searches using latitude and longitude coordinates through Google Maps and returns detailed geographic information in JSON format, including formatted address, address components (e.g., street number, city, state), place ID, and viewport bounds."""
     location = (lat, lng)
+    cached = _GEOCODE_CACHE.get(location)
+    if cached is not None:
+        return cached
     tmp = gmaps.reverse_geocode(location)
+    _GEOCODE_CACHE.set(location, tmp)
     return tmp
 
 google_maps_tools = [google_map_keyword_search, google_map_location_search]
\ No newline at end of file
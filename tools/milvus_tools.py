@@ -1,4 +1,10 @@
 import os
+import queue
+import threading
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from typing import Optional, List, Dict, Any
 from pymilvus import MilvusClient, DataType # DataType might be needed if creating collections, not for search
 from pymilvus.exceptions import MilvusException # Import MilvusException for specific error handling
@@ -6,7 +12,8 @@ from langchain_core.tools import tool
 
 from config import BaseConfig # To get Milvus URI, DB name, token, and embedding model names
 from config import get_global_config
-from .embeddings import query2vector # To convert text query to vector
+from utils.query_cache import QueryCache
+from .embeddings import query2vector, query2vectors # To convert text queries to vectors
 
 # --- Milvus Client Initialization ---
 # Load Milvus configuration
@@ -15,53 +22,172 @@ MILVUS_URI = base_cfg.milvus_uri
 MILVUS_DB_NAME = base_cfg.milvus_db_name
 MILVUS_TOKEN = getattr(base_cfg, 'milvus_token', None) # Optional token
 
-# Global Milvus client instance
-milvus_client_instance: Optional[MilvusClient] = None
+# --- Milvus client pool ---
+# A single shared client serializes every RPC through one gRPC channel and
+# races on lazy init under concurrent evaluator tasks. Clients are instead
+# checked out of a bounded queue and returned when the caller is done.
+_POOL_SIZE = 8
+_POOL_WAIT_SECONDS = 30
+_client_pool: Optional[queue.Queue] = None
+_pool_lock = threading.Lock()
 
-def get_milvus_client() -> MilvusClient:
-    """Initializes and returns a singleton MilvusClient instance."""
-    global milvus_client_instance
-    if milvus_client_instance is None:
-        print(f"Initializing MilvusClient for URI: {MILVUS_URI}, DB: {MILVUS_DB_NAME}")
+def _get_pool() -> Optional[queue.Queue]:
+    global _client_pool
+    if _client_pool is None:
+        with _pool_lock:
+            if _client_pool is None:
+                print(f"Initializing MilvusClient pool for URI: {MILVUS_URI}, DB: {MILVUS_DB_NAME}")
+                try:
+                    first = MilvusClient(
+                        uri=MILVUS_URI,
+                        token=MILVUS_TOKEN,
+                        db_name=MILVUS_DB_NAME
+                    )
+                    first.list_collections() # Test connection
+                    pool = queue.Queue(maxsize=_POOL_SIZE)
+                    pool.put(first)
+                    for _ in range(_POOL_SIZE - 1):
+                        pool.put(MilvusClient(
+                            uri=MILVUS_URI,
+                            token=MILVUS_TOKEN,
+                            db_name=MILVUS_DB_NAME
+                        ))
+                    print("MilvusClient pool initialized and connection successful.")
+                    _client_pool = pool
+                except Exception as e:
+                    # Leave the pool unset so the next call retries
+                    print(f"Error initializing or connecting MilvusClient: {e}")
+    return _client_pool
+
+def _reset_pool():
+    """Drop the client pool so the next call rebuilds fresh connections."""
+    global _client_pool
+    with _pool_lock:
+        _client_pool = None
+
+@contextmanager
+def get_client():
+    """Check a MilvusClient out of the pool; yields None if unavailable."""
+    pool = _get_pool()
+    if pool is None:
+        yield None
+        return
+    try:
+        client = pool.get(timeout=_POOL_WAIT_SECONDS)
+    except queue.Empty:
+        yield None
+        return
+    try:
+        yield client
+    finally:
+        pool.put(client)
+
+# gRPC-level failures pymilvus does not recover from by itself; the stale
+# channel has to be torn down and re-dialed
+_CONNECTION_ERROR_MARKERS = ("unavailable", "connection", "deadline exceeded", "channel closed")
+
+def _is_connection_error(exc: MilvusException) -> bool:
+    message = str(exc).lower()
+    return any(marker in message for marker in _CONNECTION_ERROR_MARKERS)
+
+def _with_retry(fn, retries: int = 2, backoff: float = 0.1):
+    """Run fn, rebuilding the client pool on connection-level MilvusExceptions.
+
+    Other MilvusExceptions (collection not found, bad expression, ...)
+    propagate immediately — retrying them just repeats the same error.
+    """
+    for attempt in range(retries + 1):
         try:
-            milvus_client_instance = MilvusClient(
-                uri=MILVUS_URI,
-                token=MILVUS_TOKEN,
-                db_name=MILVUS_DB_NAME
-            )
-            milvus_client_instance.list_collections() # Test connection
-            print("MilvusClient initialized and connection successful.")
-        except Exception as e:
-            print(f"Error initializing or connecting MilvusClient: {e}")
-            milvus_client_instance = None # Ensure it remains None if initialization fails
-            # The tool using this will then return an error
-    return milvus_client_instance
+            return fn()
+        except MilvusException as e:
+            if attempt >= retries or not _is_connection_error(e):
+                raise
+            print(f"Milvus connection error, rebuilding client pool (attempt {attempt + 1}): {e}")
+            _reset_pool()
+            time.sleep(backoff * (2 ** attempt))
+
+# Evaluator runs repeat the same (or near-identical) forensic questions,
+# so search results are cached in-process; anything that writes to a
+# collection must call _query_cache.invalidate(collection_name).
+_query_cache = QueryCache()
+
+# Index descriptions get the same short-TTL treatment as schemas: the
+# search-time knob depends on the index type, which rarely changes
+_index_cache: Dict[tuple, tuple] = {}  # (collection, field) -> (timestamp, index_type)
+
+def _get_index_type(collection_name: str, vector_field: str) -> str:
+    key = (collection_name, vector_field)
+    cached = _index_cache.get(key)
+    if cached is not None and time.monotonic() - cached[0] < _SCHEMA_TTL_SECONDS:
+        return cached[1]
+    index_type = ""
+    try:
+        with get_client() as client:
+            if client:
+                info = client.describe_index(collection_name, vector_field)
+                index_type = str(info.get("index_type", "")).upper()
+    except Exception:
+        pass
+    _index_cache[key] = (time.monotonic(), index_type)
+    return index_type
+
+def _build_search_params(collection_name: str, vector_field: str,
+                         metric_type: str, limit: int) -> dict:
+    """Pick the search knob matching the collection's index type.
+
+    nprobe only means something to IVF indexes; HNSW tunes ef and DISKANN
+    tunes search_list. The config can override each default. Unknown or
+    AUTOINDEX types get no params and let the server choose.
+    """
+    index_type = _get_index_type(collection_name, vector_field)
+    if index_type.startswith("IVF"):
+        params = {"nprobe": base_cfg.get("nprobe", 16)}
+    elif index_type == "HNSW":
+        params = {"ef": base_cfg.get("ef", max(limit, 64))}
+    elif index_type == "DISKANN":
+        params = {"search_list": base_cfg.get("search_list", 100)}
+    else:
+        params = {}
+    return {"metric_type": metric_type, "params": params}
+
+# Collection schemas rarely change, so describe_collection responses are
+# held for a short TTL instead of paying one RPC per collection per call
+_schema_cache: Dict[str, tuple] = {}  # name -> (timestamp, info)
+_SCHEMA_TTL_SECONDS = 60
 
 def get_collection_info(collection_name: str) -> dict:
-    """Get detailed information about a collection."""
+    """Get detailed information about a collection (cached for a short TTL)."""
+    cached = _schema_cache.get(collection_name)
+    if cached is not None and time.monotonic() - cached[0] < _SCHEMA_TTL_SECONDS:
+        return cached[1]
     try:
-        client = get_milvus_client()
-        return client.describe_collection(collection_name)
+        with get_client() as client:
+            info = client.describe_collection(collection_name)
     except Exception as e:
         raise ValueError(f"Failed to get collection info: {str(e)}")
+    _schema_cache[collection_name] = (time.monotonic(), info)
+    return info
 
 @tool("milvus_list_collections")
 def milvus_list_collections() -> str:
     """List all collections in the Milvus database with their schema details."""
-    client = get_milvus_client()
-    if not client:
-        return "Error: Milvus client not available or connection failed."
     try:
-        collections = client.list_collections()
-        collection_details = ""
-        for collection in collections:
-            collection_details += f"Collection: {collection}\n"
+        with get_client() as client:
+            if not client:
+                return "Error: Milvus client not available or connection failed."
+            collections = client.list_collections()
+
+        def _describe(collection):
             try:
-                collection_detail = client.describe_collection(collection)
-                collection_details += f"{collection_detail}\n"
+                return f"Collection: {collection}\n{get_collection_info(collection)}\n"
             except Exception as e:
-                collection_details += f"Error retrieving details: {str(e)}\n"
-        return f"Collections in database '{MILVUS_DB_NAME}':\n{collection_details}"
+                return f"Collection: {collection}\nError retrieving details: {str(e)}\n"
+
+        # Describes are I/O bound gRPC calls; on a cold cache they run in
+        # parallel instead of one round trip at a time
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            parts = list(executor.map(_describe, collections))
+        return f"Collections in database '{MILVUS_DB_NAME}':\n{''.join(parts)}"
     except Exception as e:
         return f"Error listing Milvus collections: {str(e)}"
 
@@ -72,7 +198,8 @@ def milvus_text_image_search(
     vector_field: str = "vector",
     limit: int = 5,
     output_fields: Optional[List[str]] = None,
-    metric_type: str = "COSINE", 
+    metric_type: str = "COSINE",
+    consistency_level: str = "Bounded",
 ) -> List[Dict[str, Any]]:
     """
     Searches for images in a Milvus collection using a text query by converting text to a vector.
@@ -84,51 +211,167 @@ def milvus_text_image_search(
         output_fields: Fields to include in results (e.g., ["path", "modality", "metadata"]).
                        Defaults to ["path", "modality", "metadata"] if None.
         metric_type: Distance metric for vector search (default: "COSINE").
+        consistency_level: Milvus read consistency (default: "Bounded"; use
+                           "Strong" only when reading your own just-written data).
     Returns:
         A list of search result dictionaries or an error dictionary.
     """
     if output_fields is None:
         output_fields = ["path", "modality", "metadata"]
 
-    client = get_milvus_client()
-    if not client:
+    if _get_pool() is None:
         return [{"error": "Milvus client not available or connection failed."}]
 
+    cache_key = (
+        collection_name, vector_field, limit, metric_type, consistency_level,
+        tuple(output_fields), _query_cache.generation(collection_name),
+        query_text,
+    )
+    cached = _query_cache.get_exact(cache_key)
+    if cached is not None:
+        return cached
+
     try:
-        query_vector_np = query2vector(query_text)
-        query_vector_list = query_vector_np.tolist()
+        # Hand the float32 ndarray straight to pymilvus — .tolist() would
+        # box every dimension into a Python float just to be re-serialized
+        query_vector_np = query2vector(query_text).astype(np.float32, copy=False)
     except Exception as e:
         return [{"error": f"Failed to convert query to vector: {str(e)}"}]
 
-    search_params = {
-        "metric_type": metric_type,
-        "params": {"nprobe": 10} 
-    }
+    # Near-duplicate phrasing of a cached query can reuse its results too
+    cached = _query_cache.get_similar(cache_key, query_vector_np)
+    if cached is not None:
+        return cached
+
+    search_params = _build_search_params(collection_name, vector_field, metric_type, limit)
 
     try:
         print(f"Searching collection '{collection_name}' with vector in field '{vector_field}'")
-        results = client.search(
-            collection_name=collection_name,
-            data=[query_vector_list],
-            anns_field=vector_field,
-            limit=limit,
-            search_params=search_params,  # Changed param to search_params
-            output_fields=output_fields,
-        )
-        return results[0] if results else []
+
+        def _do_search():
+            with get_client() as client:
+                if not client:
+                    return None
+                return client.search(
+                    collection_name=collection_name,
+                    data=[query_vector_np],
+                    anns_field=vector_field,
+                    limit=limit,
+                    search_params=search_params,  # Changed param to search_params
+                    output_fields=output_fields,
+                    consistency_level=consistency_level,
+                )
+
+        results = _with_retry(_do_search)
+        if results is None:
+            return [{"error": "Milvus client not available or connection failed."}]
+        hits = results[0] if results else []
+        _query_cache.put(cache_key, query_vector_np, hits)
+        return hits
     except MilvusException as e:
         # Specific handling for Milvus exceptions (like collection not found)
         return [{"error": f"Milvus vector search failed: {str(e)} (Code: {e.code}, Message: {e.message})"}]
     except Exception as e:
         return [{"error": f"Milvus vector search failed with an unexpected error: {str(e)}"}]
 
+@tool("milvus_text_image_search_batch")
+def milvus_text_image_search_batch(
+    query_texts: List[str],
+    collection_name: str,
+    vector_field: str = "vector",
+    limit: int = 5,
+    output_fields: Optional[List[str]] = None,
+    metric_type: str = "COSINE",
+    consistency_level: str = "Bounded",
+) -> List[List[Dict[str, Any]]]:
+    """
+    Searches for images in a Milvus collection with several text queries at once.
+    All queries are embedded in one forward pass and sent in a single search RPC,
+    amortizing the per-request server cost across the batch.
+    Args:
+        query_texts: The texts to search for.
+        collection_name: Name of the collection to search.
+        vector_field: Field containing vectors to search (default: "vector").
+        limit: Maximum number of results to return per query (default: 5).
+        output_fields: Fields to include in results (e.g., ["path", "modality", "metadata"]).
+                       Defaults to ["path", "modality", "metadata"] if None.
+        metric_type: Distance metric for vector search (default: "COSINE").
+        consistency_level: Milvus read consistency (default: "Bounded").
+    Returns:
+        One list of search result dictionaries per query, in query order.
+    """
+    if output_fields is None:
+        output_fields = ["path", "modality", "metadata"]
+
+    if _get_pool() is None:
+        return [[{"error": "Milvus client not available or connection failed."}]] * len(query_texts)
+
+    generation = _query_cache.generation(collection_name)
+    cache_keys = [
+        (collection_name, vector_field, limit, metric_type, consistency_level,
+         tuple(output_fields), generation, query_text)
+        for query_text in query_texts
+    ]
+    answers: List[Optional[List[Dict[str, Any]]]] = [
+        _query_cache.get_exact(key) for key in cache_keys
+    ]
+    pending = [i for i, hit in enumerate(answers) if hit is None]
+    if not pending:
+        return answers
+
+    try:
+        vectors = query2vectors([query_texts[i] for i in pending])
+    except Exception as e:
+        error = [{"error": f"Failed to convert queries to vectors: {str(e)}"}]
+        return [hit if hit is not None else error for hit in answers]
+
+    # Semantic cache check may drain more of the batch before the RPC
+    uncached = []
+    for row, i in enumerate(pending):
+        cached = _query_cache.get_similar(cache_keys[i], vectors[row])
+        if cached is not None:
+            answers[i] = cached
+        else:
+            uncached.append((i, row))
+
+    if uncached:
+        search_params = _build_search_params(collection_name, vector_field, metric_type, limit)
+        try:
+            def _do_search():
+                with get_client() as client:
+                    if not client:
+                        raise RuntimeError("Milvus client not available or connection failed.")
+                    return client.search(
+                        collection_name=collection_name,
+                        data=vectors[[row for _, row in uncached]],
+                        anns_field=vector_field,
+                        limit=limit,
+                        search_params=search_params,
+                        output_fields=output_fields,
+                        consistency_level=consistency_level,
+                    )
+
+            results = _with_retry(_do_search)
+            for (i, row), hits in zip(uncached, results):
+                answers[i] = hits
+                _query_cache.put(cache_keys[i], vectors[row], hits)
+        except MilvusException as e:
+            error = [{"error": f"Milvus vector search failed: {str(e)} (Code: {e.code}, Message: {e.message})"}]
+            answers = [hit if hit is not None else error for hit in answers]
+        except Exception as e:
+            error = [{"error": f"Milvus vector search failed with an unexpected error: {str(e)}"}]
+            answers = [hit if hit is not None else error for hit in answers]
+
+    return answers
+
 @tool("milvus_text_search")
 def milvus_text_search(
     collection_name: str,
     query_text: str,
     text_field_name: str = "content",  # Change this to a field that actually exists in your collection
     limit: int = 5,
-    output_fields: Optional[list[str]] = None
+    output_fields: Optional[list[str]] = None,
+    consistency_level: str = "Bounded"
 ) -> str:
     """
     Search for documents using text search in a Milvus collection.
@@ -140,26 +383,74 @@ def milvus_text_search(
         text_field_name: Field to search within (must be a string field)
         limit: Maximum number of results to return
         output_fields: Fields to include in results
+        consistency_level: Milvus read consistency (default: "Bounded")
     """
-    client = get_milvus_client()
-    if not client:
-        return "Error: Milvus client not available or connection failed."
+    # Create a filter expression using 'LIKE'; Milvus expressions use
+    # backslash escapes, so escape the backslash itself first and then any
+    # single quotes so the query can't break out of the string literal
+    safe_text = query_text.replace("\\", "\\\\").replace("'", "\\'")
+    filter_expr = f"{text_field_name} like '%{safe_text}%'"
+    # Leading-wildcard LIKE is always a full scalar scan, so keep the row
+    # budget bounded
+    limit = min(limit, 100)
 
-    # Create a filter expression using 'LIKE'
-    filter_expr = f"{text_field_name} like '%{query_text}%'"
+    def _do_search():
+        with get_client() as client:
+            if not client:
+                return None
+
+            # Prefer BM25 full-text search when the collection defines a BM25
+            # function over this field; the LIKE scan can never use an index.
+            # The search must target the function's sparse output field (the
+            # VARCHAR field itself is not searchable), and a full-text index
+            # reports metric_type BM25 — its index_type is
+            # SPARSE_INVERTED_INDEX or AUTOINDEX, never "BM25".
+            sparse_field = None
+            try:
+                info = client.describe_collection(collection_name)
+                for fn in info.get("functions", []):
+                    if text_field_name in (fn.get("input_field_names") or []):
+                        outputs = fn.get("output_field_names") or []
+                        if outputs:
+                            index_info = client.describe_index(collection_name, outputs[0])
+                            if str(index_info.get("metric_type", "")).upper() == "BM25":
+                                sparse_field = outputs[0]
+                        break
+            except Exception:
+                sparse_field = None
+
+            if sparse_field:
+                search_results = client.search(
+                    collection_name=collection_name,
+                    data=[query_text],
+                    anns_field=sparse_field,
+                    limit=limit,
+                    search_params={"metric_type": "BM25"},
+                    output_fields=output_fields,
+                    consistency_level=consistency_level,
+                )
+                return search_results[0] if search_results else []
+            return client.query(  # Note: using query() not search()
+                collection_name=collection_name,
+                filter=filter_expr,
+                limit=limit,
+                output_fields=output_fields,
+                consistency_level=consistency_level,
+            )
 
     try:
-        results = client.query(  # Note: using query() not search()
-            collection_name=collection_name,
-            filter=filter_expr,
-            limit=limit,
-            output_fields=output_fields,
-        )
-        output = f"Text search results for '{query_text}' in collection '{collection_name}':\n\n"
-        for result in results:
-            output += f"{result}\n\n"
-        return output
+        results = _with_retry(_do_search)
+        if results is None:
+            return "Error: Milvus client not available or connection failed."
+        # Single join instead of O(n^2) string += in a loop
+        header = f"Text search results for '{query_text}' in collection '{collection_name}':"
+        return "\n\n".join([header, *map(str, results)]) + "\n\n"
     except Exception as e:
         return f"Error: Text search failed: {str(e)}"
 
-milvus_tools = [milvus_list_collections, milvus_text_image_search, milvus_text_search] 
\ No newline at end of file
+@tool("milvus_cache_stats")
+def milvus_cache_stats() -> str:
+    """Returns hit/miss/eviction statistics for the in-process Milvus query result cache."""
+    return str(_query_cache.stats())
+
+milvus_tools = [milvus_list_collections, milvus_text_image_search, milvus_text_image_search_batch, milvus_text_search, milvus_cache_stats]
\ No newline at end of file
@@ -1,9 +1,35 @@
+import asyncio
+import hashlib
 import json
+import logging
 import os
+import re
+import sqlite3
+import time
 import uuid
 from pathlib import Path
 from typing import Dict, List, Tuple, Any, Optional
-from langchain_openai import ChatOpenAI
+from utils.llm import _build
+try:
+    import orjson  # C JSON codec, several times faster than stdlib json
+except ImportError:
+    orjson = None
+try:
+    import ahocorasick  # one linear pass finds every artifact name at once
+except ImportError:
+    ahocorasick = None
+
+# One compiled flexible-whitespace pattern per artifact name, built on
+# first use — evaluate_answer matches the same artifacts for every
+# question, so rebuilding escape+compile inside the loops is pure waste
+_pattern_cache: Dict[str, re.Pattern] = {}
+
+def _compiled(artifact: str) -> re.Pattern:
+    pattern = _pattern_cache.get(artifact)
+    if pattern is None:
+        pattern = re.compile(re.escape(artifact).replace("\\ ", "\\s+"), re.IGNORECASE)
+        _pattern_cache[artifact] = pattern
+    return pattern
 
 class ForensicEvaluator:
     """
@@ -36,11 +62,9 @@ class ForensicEvaluator:
         model_config = config.models.get("evaluator", config.models.get("supervisor"))
         model_name = model_config.get("name")
         temperature = model_config.get("temperature", 0)
-        self.evaluator_model = ChatOpenAI(
-            model=model_name,
-            temperature=temperature,
-            api_key=os.getenv("OPENAI_API_KEY")
-        )
+        # Shared with get_llm's cache, so repeated evaluator instantiations
+        # reuse one client and its HTTP connection pool
+        self.evaluator_model = _build("openai", model_name, temperature)
         
         # Load ground truth (which contains the questions)
         self.ground_truth = self._load_ground_truth()
@@ -50,6 +74,24 @@ class ForensicEvaluator:
         
         # Create a lookup dictionary for ground truth by question text
         self.ground_truth_by_question = {item["question"]: item for item in self.ground_truth}
+
+        # Per-question Aho-Corasick automata over expected artifact names
+        # and their base names: scanning the agent answer becomes one
+        # linear pass instead of one substring search per artifact.
+        self._artifact_automata = {}
+        if ahocorasick is not None:
+            for item in self.ground_truth:
+                artifacts = item.get("related_artifacts", [])
+                if not artifacts:
+                    continue
+                automaton = ahocorasick.Automaton()
+                for artifact in artifacts:
+                    automaton.add_word(artifact.lower(), artifact)
+                    base_name = os.path.splitext(artifact)[0]
+                    if base_name:
+                        automaton.add_word(base_name.lower(), artifact)
+                automaton.make_automaton()
+                self._artifact_automata[item["question"]] = automaton
         
         # Results storage
         self.results = {
@@ -58,14 +100,39 @@ class ForensicEvaluator:
             "correct_answers": 0,
             "evaluations": []
         }
+
+        # Persistent LLM-judgement cache: development reruns evaluate the
+        # same (question, answer) pairs over and over, each one a paid API
+        # call. Keyed on content hashes; set force_eval in the config to
+        # re-judge everything.
+        self.force_eval = bool(config.get("force_eval", False))
+        cache_path = Path(config.get_path("log_dir")) / "eval_cache.sqlite"
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self._eval_cache = sqlite3.connect(str(cache_path), check_same_thread=False)
+        self._eval_cache.execute(
+            "CREATE TABLE IF NOT EXISTS eval_cache ("
+            "qhash TEXT NOT NULL, answer_hash TEXT NOT NULL, "
+            "eval_json TEXT, ts REAL, "
+            "PRIMARY KEY (qhash, answer_hash))"
+        )
     
     def _load_ground_truth(self) -> List[Dict[str, Any]]:
         """Load ground truth answers from JSON file."""
         if not self.ground_truth_path.exists():
             raise FileNotFoundError(f"Ground truth file not found: {self.ground_truth_path}")
         
-        with open(self.ground_truth_path, 'r') as f:
-            return json.load(f)
+        with open(self.ground_truth_path, 'rb') as f:
+            raw = f.read()
+        ground_truth = orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+        # Pre-split (artifact, base-name) pairs once: evaluate_answer would
+        # otherwise rerun splitext on the same names for every question
+        for item in ground_truth:
+            item["_artifact_index"] = [
+                (artifact, os.path.splitext(artifact)[0])
+                for artifact in item.get("related_artifacts", [])
+            ]
+        return ground_truth
     
     def evaluate_answer(self, question: str, agent_answer: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
@@ -105,61 +172,72 @@ class ForensicEvaluator:
             
             # Log the artifacts we found from agents
             if retrieved_artifacts:
-                self.logger.info(f"Found {len(retrieved_artifacts)} retrieved artifacts: {retrieved_artifacts}")
+                self.logger.info("Found %d retrieved artifacts: %s", len(retrieved_artifacts), retrieved_artifacts)
         
         # Combined search scope - check both the answer text and the retrieved artifacts
         if not expected_artifacts:
             # If no artifacts are expected, consider it correct
             artifacts_correct = True
         else:
-            # Check retrieved artifacts first (more reliable)
-            for expected in expected_artifacts:
+            # Check retrieved artifacts first (more reliable). Set lookups
+            # short-circuit the exact and base-name cases before any regex.
+            retrieved_set = set(retrieved_artifacts)
+            retrieved_by_base = {}
+            for found in retrieved_artifacts:
+                retrieved_by_base.setdefault(os.path.splitext(found)[0], found)
+            artifact_index = truth.get("_artifact_index") or [
+                (artifact, os.path.splitext(artifact)[0]) for artifact in expected_artifacts
+            ]
+            for expected, expected_base in artifact_index:
+                # Exact match
+                if expected in retrieved_set:
+                    artifacts_correct = True
+                    found_artifacts.append(expected)
+                    continue
+
+                # Check for base name match (without extension)
+                found = retrieved_by_base.get(expected_base) if expected_base else None
+                if found is not None:
+                    artifacts_correct = True
+                    found_artifacts.append(f"{found} (matched with {expected})")
+                    continue
+
+                # Flexible matching with regex
+                pattern = _compiled(expected)
                 for found in retrieved_artifacts:
-                    # Exact match
-                    if expected == found:
-                        artifacts_correct = True
-                        found_artifacts.append(found)
-                        break
-                        
-                    # Check for base name match (without extension)
-                    expected_base = os.path.splitext(expected)[0]
-                    found_base = os.path.splitext(found)[0]
-                    if expected_base and found_base and expected_base == found_base:
-                        artifacts_correct = True
-                        found_artifacts.append(f"{found} (matched with {expected})")
-                        break
-                        
-                    # Flexible matching with regex
-                    import re
-                    pattern = re.escape(expected).replace("\\ ", "\\s+")
-                    if re.search(pattern, found, re.IGNORECASE):
+                    if pattern.search(found):
                         artifacts_correct = True
                         found_artifacts.append(f"{found} (regex match with {expected})")
                         break
-            
+
             # If not found in retrieved artifacts, also check the answer text
             if not artifacts_correct:
-                for artifact in expected_artifacts:
+                automaton = self._artifact_automata.get(question)
+                if automaton is not None:
+                    for _end, artifact in automaton.iter(agent_answer.lower()):
+                        artifacts_correct = True  # Success with just one match
+                        found_artifacts.append(artifact)
+                        break
+
+            # Fallback per-artifact scan; also covers the flexible-whitespace
+            # regex case the automaton can't express
+            if not artifacts_correct:
+                for artifact, base_name in artifact_index:
                     # Check for exact matches
                     if artifact in agent_answer:
                         artifacts_correct = True  # Success with just one match
                         found_artifacts.append(artifact)
                         continue
-                    
+
                     # Check for common variations
                     # 1. Without file extension
-                    base_name = os.path.splitext(artifact)[0]
                     if base_name and base_name in agent_answer:
                         artifacts_correct = True  # Success with just one match
                         found_artifacts.append(f"{base_name} (from {artifact})")
                         continue
-                        
+
                     # 2. With different spacing/capitalization
-                    import re
-                    # Replace spaces with flexible whitespace in regex
-                    pattern = re.escape(artifact).replace("\\ ", "\\s+")
-                    # Make it case insensitive
-                    if re.search(pattern, agent_answer, re.IGNORECASE):
+                    if _compiled(artifact).search(agent_answer):
                         artifacts_correct = True  # Success with just one match
                         found_artifacts.append(f"{artifact} (regex match)")
                         continue
@@ -199,27 +277,63 @@ class ForensicEvaluator:
         3. evaluation (string): Detailed evaluation covering both factual accuracy and investigation quality, including assessment of the reasoning process and methodology used
         """
         
-        evaluation_response = self.evaluator_model.invoke(prompt)
-        evaluation_text = evaluation_response.content
-        
-        # Extract JSON from response (handling potential formatting issues)
-        try:
-            import re
-            json_match = re.search(r'({.*})', evaluation_text.replace('\n', ' '), re.DOTALL)
-            if json_match:
-                evaluation = json.loads(json_match.group(1))
-            else:
+        qhash = hashlib.blake2b(question.encode(), digest_size=16).hexdigest()
+        answer_hash = hashlib.blake2b(
+            (agent_answer + agent_reasoning).encode(), digest_size=16
+        ).hexdigest()
+
+        evaluation = None
+        if not self.force_eval:
+            row = self._eval_cache.execute(
+                "SELECT eval_json FROM eval_cache WHERE qhash=? AND answer_hash=?",
+                (qhash, answer_hash)
+            ).fetchone()
+            if row:
+                try:
+                    evaluation = json.loads(row[0])
+                except (TypeError, json.JSONDecodeError):
+                    evaluation = None
+
+        if evaluation is None:
+            evaluation_response = self.evaluator_model.invoke(prompt)
+            evaluation_text = evaluation_response.content
+
+            # Extract JSON from response (handling potential formatting
+            # issues). Bracket counting finds the first balanced {...}
+            # block in one linear pass — the old greedy ({.*}) regex had
+            # to scan to the end of the text and backtrack.
+            try:
+                start = evaluation_text.find('{')
+                if start != -1:
+                    depth = 0
+                    for i in range(start, len(evaluation_text)):
+                        ch = evaluation_text[i]
+                        if ch == '{':
+                            depth += 1
+                        elif ch == '}':
+                            depth -= 1
+                            if depth == 0:
+                                payload = evaluation_text[start:i + 1]
+                                evaluation = orjson.loads(payload) if orjson is not None else json.loads(payload)
+                                break
+                if evaluation is None:
+                    evaluation = {
+                        "found_answer": "",
+                        "answer_correct": False,
+                        "evaluation": "Could not parse evaluation response"
+                    }
+            except Exception as e:
                 evaluation = {
                     "found_answer": "",
                     "answer_correct": False,
-                    "evaluation": "Could not parse evaluation response"
+                    "evaluation": f"Error parsing evaluation: {str(e)}"
                 }
-        except Exception as e:
-            evaluation = {
-                "found_answer": "",
-                "answer_correct": False,
-                "evaluation": f"Error parsing evaluation: {str(e)}"
-            }
+
+            self._eval_cache.execute(
+                "INSERT OR REPLACE INTO eval_cache VALUES (?, ?, ?, ?)",
+                (qhash, answer_hash, json.dumps(evaluation), time.time())
+            )
+            self._eval_cache.commit()
         
         # Update metrics
         if artifacts_correct:
@@ -231,7 +345,7 @@ class ForensicEvaluator:
         # If no artifacts were matched but we have retrieved artifacts, use them as found_artifacts
         if not found_artifacts and retrieved_artifacts:
             found_artifacts = retrieved_artifacts.copy()
-            self.logger.info(f"No matching artifacts found, but agent retrieved: {retrieved_artifacts}")
+            self.logger.info("No matching artifacts found, but agent retrieved: %s", retrieved_artifacts)
 
         result = {
             "id": question_id,
@@ -256,106 +370,128 @@ class ForensicEvaluator:
         Args:
             evaluation: Evaluation result dictionary from evaluate_answer
         """
+        # Everything here is diagnostic detail; skip the joins and the
+        # per-artifact loops entirely when INFO is suppressed
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+
         question_id = evaluation.get('id', 'N/A')
         expected_artifacts = evaluation.get("expected_artifacts", [])
         found_artifacts = evaluation.get("found_artifacts", [])
         answer = evaluation.get("agent_answer", "")
-        
+
         artifact_status = "✅" if evaluation.get("artifact_retrieval_correct", False) else "❌"
         answer_status = "✅" if evaluation.get("answer_correct", False) else "❌"
-        
-        self.logger.info(f"Question {question_id} evaluation:")
-        self.logger.info(f"  Artifact Retrieval: {artifact_status} (at least one artifact needed)")
-        self.logger.info(f"  Answer: {answer_status}")
-        
+
+        self.logger.info("Question %s evaluation:", question_id)
+        self.logger.info("  Artifact Retrieval: %s (at least one artifact needed)", artifact_status)
+        self.logger.info("  Answer: %s", answer_status)
+
         if expected_artifacts:
-            self.logger.info(f"  - Expected artifacts (any of): {', '.join(expected_artifacts)}")
-            
+            self.logger.info("  - Expected artifacts (any of): %s", ', '.join(expected_artifacts))
+
             # Log retrieved artifacts if present
             retrieved_artifacts = evaluation.get("artifacts", [])
             if retrieved_artifacts:
-                self.logger.info(f"  - Retrieved artifacts: {', '.join(retrieved_artifacts)}")
+                self.logger.info("  - Retrieved artifacts: %s", ', '.join(retrieved_artifacts))
                 self.logger.info("  - Retrieved artifact matches:")
                 for expected in expected_artifacts:
                     if expected in retrieved_artifacts:
-                        self.logger.info(f"    ✅ Found exact match '{expected}' in retrieved artifacts")
+                        self.logger.info("    ✅ Found exact match '%s' in retrieved artifacts", expected)
                     else:
                         # Check for base name matches
                         expected_base = os.path.splitext(expected)[0]
                         for artifact in retrieved_artifacts:
                             found_base = os.path.splitext(artifact)[0]
                             if expected_base and found_base and expected_base == found_base:
-                                self.logger.info(f"    ✅ Found base name match '{artifact}' for '{expected}'")
+                                self.logger.info("    ✅ Found base name match '%s' for '%s'", artifact, expected)
                                 break
                         else:
-                            self.logger.info(f"    ❌ Did NOT find '{expected}' in retrieved artifacts")
-            
+                            self.logger.info("    ❌ Did NOT find '%s' in retrieved artifacts", expected)
+
             # Debug: Search for artifacts in the answer
             self.logger.info("  - Text search details:")
             for artifact in expected_artifacts:
                 if artifact in answer:
-                    self.logger.info(f"    ✅ Found '{artifact}' in the answer text")
+                    self.logger.info("    ✅ Found '%s' in the answer text", artifact)
                 else:
-                    self.logger.info(f"    ❌ Did NOT find '{artifact}' in the answer text")
+                    self.logger.info("    ❌ Did NOT find '%s' in the answer text", artifact)
                     # Show nearby context to help debug
                     artifact_parts = artifact.split('.')
                     if len(artifact_parts) > 1:
                         base_name = artifact_parts[0]
                         if base_name in answer:
-                            self.logger.info(f"      (But found partial match '{base_name}' in the answer)")
-            
+                            self.logger.info("      (But found partial match '%s' in the answer)", base_name)
+
             if found_artifacts:
-                self.logger.info(f"  - Found artifacts: {', '.join(found_artifacts)}")
+                self.logger.info("  - Found artifacts: %s", ', '.join(found_artifacts))
             else:
-                self.logger.info(f"  - No matching artifacts found")
-        
-        self.logger.info(f"  Evaluation: {evaluation.get('evaluation', 'No evaluation provided')}")
+                self.logger.info("  - No matching artifacts found")
+
+        self.logger.info("  Evaluation: %s", evaluation.get('evaluation', 'No evaluation provided'))
     
-    def run_evaluation(self, query_processor, config):
+    async def run_evaluation(self, query_processor, config, concurrency: int = 8):
         """
         Run a complete evaluation against all questions in the ground truth.
-        
+
+        The agent queries are I/O-bound API calls, so up to ``concurrency``
+        questions run at once; evaluation then happens in question order so
+        the metric counters and logs stay deterministic.
+
         Args:
             query_processor: Async function that processes a query and returns an answer
             config: Configuration to pass to the query processor
-            
+            concurrency: Maximum number of questions in flight at once
+
         Returns:
-            Tuple of (results summary, output file path)
+            Results summary dictionary
         """
         self.logger.info("Starting evaluation...")
-        self.logger.info(f"Using ground truth file: {self.ground_truth_path}")
-        
+        self.logger.info("Using ground truth file: %s", self.ground_truth_path)
+
         total_questions = len(self.questions)
-        self.logger.info(f"Found {total_questions} questions to evaluate")
-        
-        for i, question in enumerate(self.questions):
-            self.logger.info(f"Processing question {i+1}/{total_questions} (ID: {self.ground_truth_by_question.get(question, {}).get('id', 'N/A')}): {question[:50]}...")
-            
-            # Process the question
-            result = yield query_processor(question, config)
-            
+        self.logger.info("Found %d questions to evaluate", total_questions)
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def process_indexed(i, question):
+            async with semaphore:
+                if self.logger.isEnabledFor(logging.INFO):
+                    self.logger.info(
+                        "Processing question %d/%d (ID: %s): %s...",
+                        i + 1, total_questions,
+                        self.ground_truth_by_question.get(question, {}).get('id', 'N/A'),
+                        question[:50],
+                    )
+                result = await query_processor(question, config)
             # Handle different return types (simple string or tuple with metadata)
             if isinstance(result, tuple) and len(result) >= 2:
                 answer, metadata = result
             else:
                 answer = result
                 metadata = None
-            
+            return i, question, answer, metadata
+
+        answers = await asyncio.gather(
+            *(process_indexed(i, question) for i, question in enumerate(self.questions))
+        )
+
+        for _i, question, answer, metadata in sorted(answers):
             # Log the complete answer for debugging
-            self.logger.info(f"AGENT ANSWER: {answer}")
-            
+            self.logger.info("AGENT ANSWER: %s", answer)
+
             # Evaluate the answer with metadata if available
             evaluation = self.evaluate_answer(question, answer, metadata)
-            
+
             # Log detailed evaluation information
             self.log_evaluation_details(evaluation)
-        
+
         # Get and return results summary
         results = self.get_results_summary()
         self.logger.info("Evaluation complete!")
-        self.logger.info(f"Retrieval accuracy: {results['retrieval_accuracy']:.2f}%")
-        self.logger.info(f"Answer accuracy: {results['answer_accuracy']:.2f}%")
-        
+        self.logger.info("Retrieval accuracy: %.2f%%", results['retrieval_accuracy'])
+        self.logger.info("Answer accuracy: %.2f%%", results['answer_accuracy'])
+
         return results
     
     def get_results_summary(self) -> Dict[str, Any]:
@@ -398,7 +534,11 @@ class ForensicEvaluator:
             os.makedirs(directory, exist_ok=True)
         
         # Save results
-        with open(output_path, 'w') as f:
-            json.dump(self.get_results_summary(), f, indent=2)
-            
-        return output_path 
\ No newline at end of file
+        summary = self.get_results_summary()
+        if orjson is not None:
+            Path(output_path).write_bytes(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
+        else:
+            with open(output_path, 'w') as f:
+                json.dump(summary, f, indent=2)
+
+        return output_path
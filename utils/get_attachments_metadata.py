@@ -1,74 +1,122 @@
+import atexit
 import exiftool
 import os
+import threading
 
-def get_all_metadata(file_path):
-    """
-    Extract all available metadata from a file using ExifTool and return it as a formatted string.
+# Tags to exclude (directories and dates). Full tag names live in a
+# frozenset for O(1) lookup; the generic ':date'/':time' fragments stay
+# substring-matched.
+_EXCLUDE_EXACT = frozenset(pattern.lower() for pattern in (
+    # Directory-related tags
+    'File:Directory',
+    'File:FileName',
+    'SourceFile',
+    # Date-related tags
+    'File:FileModifyDate',
+    'File:FileAccessDate',
+    'File:FileCreateDate',
+    'EXIF:CreateDate',
+    'EXIF:ModifyDate',
+    'EXIF:DateTimeOriginal',
+    'XMP:CreateDate',
+    'XMP:ModifyDate',
+    'XMP:DateCreated',
+    'IPTC:DateCreated',
+    'IPTC:TimeCreated',
+    'File:FileInodeChangeDate',
+))
+_EXCLUDE_SUBSTRINGS = (':date', ':time')
+
+# One long-lived exiftool process (-stay_open mode) shared by every
+# caller — spawning a fresh Perl interpreter per file costs far more than
+# the extraction itself on small attachments. The lock serializes access
+# to the single subprocess pipe.
+_et = None
+_et_lock = threading.Lock()
+
+def _shutdown_exiftool():
+    global _et
+    if _et is not None:
+        try:
+            _et.__exit__(None, None, None)
+        except Exception:
+            pass
+        _et = None
+
+def _get_exiftool():
+    """Return the shared ExifToolHelper, starting it on first use.
+
+    Callers must hold _et_lock.
     """
-    try:
-        # Ensure absolute path
-        file_path = os.path.abspath(file_path)
-        if not os.path.exists(file_path):
-            return f"Error: File '{file_path}' does not exist."
-        
-        # Initialize the string that will collect all metadata in a human-readable format
-        metadata_string = "ExifTool Metadata:\n"
+    global _et
+    if _et is None:
+        helper = exiftool.ExifToolHelper()
+        helper.__enter__()
+        atexit.register(_shutdown_exiftool)
+        _et = helper
+    return _et
 
-        with exiftool.ExifToolHelper() as et:
-            # Extract all metadata
-            metadata = et.get_metadata(file_path)[0]  # Returns a dict for the first file
+def _format_metadata(metadata) -> str:
+    """Format one file's metadata dict into the human-readable string."""
+    # List accumulator + one join: += on a str reallocates on every append
+    parts = ["ExifTool Metadata:"]
 
-        if not metadata:
-            metadata_string += "  (No metadata found)\n"
-            return metadata_string.strip()
+    if not metadata:
+        parts.append("  (No metadata found)")
+        return "\n".join(parts).strip()
 
-        # Define tags to exclude (directories and dates)
-        exclude_patterns = [
-            # Directory-related tags
-            'File:Directory',
-            'File:FileName',
-            'SourceFile',
-            # Date-related tags
-            'File:FileModifyDate',
-            'File:FileAccessDate',
-            'File:FileCreateDate',
-            'EXIF:CreateDate',
-            'EXIF:ModifyDate',
-            'EXIF:DateTimeOriginal',
-            'XMP:CreateDate',
-            'XMP:ModifyDate',
-            'XMP:DateCreated',
-            'IPTC:DateCreated',
-            'IPTC:TimeCreated',
-            'File:FileInodeChangeDate',
-            ':Date',
-            ':Time'
-        ]
+    # Format metadata into string, excluding unwanted tags
+    parts.append("ExifTool Metadata (Excluding Directories and Dates):")
+    filtered = False
+    for key, value in sorted(metadata.items()):
+        # Skip if value is empty or None
+        if value is None or not str(value).strip():
+            continue
+        # Skip if key matches any exclude pattern
+        key_lower = key.lower()
+        if key_lower in _EXCLUDE_EXACT or any(fragment in key_lower for fragment in _EXCLUDE_SUBSTRINGS):
+            continue
+        parts.append(f"  {key}: {value}")
+        filtered = True
 
-        # Format metadata into string, excluding unwanted tags
-        metadata_string += "ExifTool Metadata (Excluding Directories and Dates):\n"
-        filtered_metadata = []
-        for key, value in sorted(metadata.items()):
-            # Skip if value is empty or None
-            if value is None or not str(value).strip():
-                continue
-            # Skip if key matches any exclude pattern
-            if any(pattern.lower() in key.lower() for pattern in exclude_patterns):
-                continue
-            filtered_metadata.append(f"  {key}: {value}")
+    if not filtered:
+        parts.append("  (No metadata found after filtering directories and dates)")
 
-        if filtered_metadata:
-            metadata_string += "\n".join(filtered_metadata)
-        else:
-            metadata_string += "  (No metadata found after filtering directories and dates)"
+    return "\n".join(parts).strip()
 
-        return metadata_string.strip()
+def get_all_metadata_batch(file_paths):
+    """
+    Extract metadata for several files in one exiftool round trip and
+    return the formatted strings in input order.
+    """
+    resolved = [os.path.abspath(p) for p in file_paths]
+    results = {}
+    existing = [p for p in resolved if os.path.exists(p)]
 
+    if existing:
+        try:
+            with _et_lock:
+                metadata_list = _get_exiftool().get_metadata(existing)
+            for file_path, metadata in zip(existing, metadata_list):
+                results[file_path] = _format_metadata(metadata)
+        except exiftool.exceptions.ExifToolExecuteError as e:
+            message = f"Error: ExifTool failed to execute. Ensure ExifTool is installed and in PATH.\nDetails: {str(e)}"
+            for file_path in existing:
+                results[file_path] = message
+        except Exception as e:
+            for file_path in existing:
+                results[file_path] = f"Error extracting metadata for '{file_path}': {str(e)}"
 
-    except exiftool.exceptions.ExifToolExecuteError as e:
-        return f"Error: ExifTool failed to execute. Ensure ExifTool is installed and in PATH.\nDetails: {str(e)}"
-    except Exception as e:
-        return f"Error extracting metadata for '{file_path}': {str(e)}"
+    return [
+        results.get(p, f"Error: File '{p}' does not exist.")
+        for p in resolved
+    ]
+
+def get_all_metadata(file_path):
+    """
+    Extract all available metadata from a file using ExifTool and return it as a formatted string.
+    """
+    return get_all_metadata_batch([file_path])[0]
 
 # Example usage
 if __name__ == "__main__":
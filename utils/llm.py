@@ -1,40 +1,62 @@
 import os
+from functools import lru_cache
 from langchain_anthropic import ChatAnthropic
 from langchain_openai import ChatOpenAI
 from config import BaseConfig
 
 
+@lru_cache(maxsize=32)
+def _build(provider: str, model_name: str, temperature):
+    """
+    Construct (or return the cached) chat model for a provider/model pair.
+
+    Constructing a client eagerly opens an httpx connection pool and a
+    token encoder, so agents sharing the same model config should share
+    one instance — that also lets the pooled HTTP connections be reused
+    across calls. Pass temperature=None to leave the provider default.
+    """
+    if provider == "anthropic":
+        return ChatAnthropic(
+            model=model_name,
+            temperature=temperature,
+            anthropic_api_key=os.getenv("ANTHROPIC_API_KEY"),
+            stream_usage=True
+        )
+
+    # Default to OpenAI
+    kwargs = {}
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+    return ChatOpenAI(
+        model=model_name,
+        api_key=os.getenv("OPENAI_API_KEY"),
+        **kwargs
+    )
+
+
 def get_llm(cfg: BaseConfig, agent_type="supervisor"):
     """
     Get a language model instance based on configuration.
-    
+
     Args:
         cfg: Configuration object
         agent_type: The type of agent ('supervisor', 'reasoning', 'forensic', 'web')
                     to determine which model config to use
-    
+
     Returns:
-        A language model instance (ChatOpenAI or ChatAnthropic)
+        A language model instance (ChatOpenAI or ChatAnthropic), shared
+        across callers with the same provider/model/temperature
     """
     # Get model config for the specified agent type
     model_config = cfg.models.get(agent_type, cfg.models.get("forensic"))
-    
+
     # Extract parameters
     model_name = model_config.get("name")
     provider = model_config.get("provider", "").lower()
     temperature = model_config.get("temperature", 0)
-    
-    # Create and return the appropriate LLM
+
     if provider == "anthropic":
-        return ChatAnthropic(
-            model=model_name, 
-            temperature=temperature, 
-            anthropic_api_key=os.getenv("ANTHROPIC_API_KEY"), 
-            stream_usage=True
-        )
-    
-    # Default to OpenAI
-    return ChatOpenAI(
-        model=model_name, 
-        api_key=os.getenv("OPENAI_API_KEY")
-    )
\ No newline at end of file
+        return _build("anthropic", model_name, temperature)
+
+    # The OpenAI path historically left temperature at the provider default
+    return _build("openai", model_name, None)
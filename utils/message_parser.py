@@ -4,9 +4,75 @@ Message parsing utilities for extracting artifacts and reasoning from agent mess
 
 import re
 import os
+from functools import lru_cache
 from typing import List
 from pathlib import Path
 
+# Compiled once at import: these run on every message of every agent
+# conversation, so don't pay the re module cache lookup per call.
+_FILENAME_RE = re.compile(r"[\w\-][\w\s\-]*\.(?:csv|txt|log|json|xml|html|db|sqlite)", re.IGNORECASE)
+_REASONING_RE = re.compile(r"REASONING:(.*?)(?:ARTIFACTS:|$)", re.DOTALL | re.IGNORECASE)
+
+# One filename index per base path, invalidated when the directory's own
+# mtime changes. Validating K artifacts against the index is K dict
+# lookups instead of K recursive rglob walks over the export tree.
+_artifact_index_cache = {}  # root path -> (mtime_ns, {filename_lower: path})
+
+
+def _build_artifact_index(root: str) -> dict:
+    index = {}
+    # os.walk (scandir-based) amortizes one traversal across every artifact
+    # lookup and swallows unreadable directories by default
+    for dirpath, dirs, files in os.walk(root):
+        # Prune hidden/system directories in place so walk never descends
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        for name in files:
+            index.setdefault(name.lower(), os.path.join(dirpath, name))
+    return index
+
+
+@lru_cache(maxsize=1)
+def _get_base_paths(root_dir: str) -> tuple:
+    """Candidate directories for artifact validation, built once per run.
+
+    Covers the export root, its Attachments subdirectory, the case
+    directory, and their immediate subdirectories. scandir's cached
+    entry metadata avoids a stat per child; the tuple return keeps the
+    result hashable for lru_cache.
+    """
+    roots = [
+        Path(root_dir),  # e.g., test/backup/case_2022_windows/Export
+        Path(root_dir) / "Attachments",
+        Path(root_dir).parent,  # case directory
+    ]
+    base_paths = []
+    for base in roots:
+        if not base.exists():
+            continue
+        base_paths.append(base)
+        try:
+            with os.scandir(base) as it:
+                base_paths.extend(
+                    Path(entry.path) for entry in it
+                    if entry.is_dir(follow_symlinks=False)
+                )
+        except OSError:
+            continue
+    return tuple(base_paths)
+
+
+def _get_artifact_index(root: str) -> dict:
+    try:
+        mtime_ns = os.stat(root).st_mtime_ns
+    except OSError:
+        return {}
+    cached = _artifact_index_cache.get(root)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+    index = _build_artifact_index(root)
+    _artifact_index_cache[root] = (mtime_ns, index)
+    return index
+
 
 def validate_artifacts_exist(artifacts: List[str], config) -> List[str]:
     """
@@ -26,20 +92,9 @@ def validate_artifacts_exist(artifacts: List[str], config) -> List[str]:
     
     # Get the case directory paths
     try:
-        root_dir = config.get_path("root_dir")  # e.g., test/backup/case_2022_windows/Export
-        base_paths = [
-            Path(root_dir),
-            Path(root_dir) / "Attachments",
-            Path(root_dir).parent,  # case directory
-        ]
-        
-        # Also check common subdirectories
-        for base_path in list(base_paths):
-            if base_path.exists():
-                for subdir in base_path.iterdir():
-                    if subdir.is_dir():
-                        base_paths.append(subdir)
-        
+        # root_dir is fixed for the life of a run, so the candidate list is
+        # built once (see _get_base_paths)
+        base_paths = _get_base_paths(config.get_path("root_dir"))
     except Exception:
         # Fallback to common paths if config fails
         base_paths = [
@@ -49,35 +104,20 @@ def validate_artifacts_exist(artifacts: List[str], config) -> List[str]:
             Path("."),
         ]
     
+    # Each base path's tree is walked once and indexed by lowercased
+    # filename; per-artifact validation is then a dict lookup
+    indexes = [
+        _get_artifact_index(str(base_path))
+        for base_path in base_paths
+        if base_path.exists()
+    ]
+
     for artifact in artifacts:
-        found = False
-        
-        # Check in all possible base paths
-        for base_path in base_paths:
-            if not base_path.exists():
-                continue
-                
-            # Try exact match first
-            artifact_path = base_path / artifact
-            if artifact_path.exists():
-                validated_artifacts.append(artifact)
-                found = True
-                break
-            
-            # Try recursive search for the filename
-            try:
-                for file_path in base_path.rglob(artifact):
-                    if file_path.is_file():
-                        validated_artifacts.append(artifact)
-                        found = True
-                        break
-                if found:
-                    break
-            except (PermissionError, OSError):
-                # Skip directories we can't access
-                continue
-        
-        if not found:
+        key = artifact.lower()
+        found = any(key in index for index in indexes)
+        if found:
+            validated_artifacts.append(artifact)
+        else:
             # Log missing artifact but don't include it
             print(f"Warning: Artifact '{artifact}' not found in file system")
     
@@ -94,31 +134,21 @@ def extract_artifacts_from_message(message_content: str) -> List[str]:
     Returns:
         List of unique artifact filenames found in the message
     """
-    artifacts = []
-    
-    # Look for filenames in the "ARTIFACTS:" section if present
-    artifacts_section = re.search(r"ARTIFACTS:(.*?)(?:REASONING:|$)", message_content, re.DOTALL | re.IGNORECASE)
-    if artifacts_section:
-        section_text = artifacts_section.group(1).strip()
-        # Extract filenames that match patterns like *.csv, *.txt, etc.
-        filename_matches = re.findall(r"[\w\s\-]+\.(csv|txt|log|json|xml|html|db|sqlite)", section_text, re.IGNORECASE)
-        artifacts.extend([match.strip() for match in filename_matches if match.strip()])
-    
-    # Also look for explicit filenames in the general text
-    general_filenames = re.findall(r"['\"]?([\w\s\-]+\.(csv|txt|log|json|xml|html|db|sqlite))['\"]?", 
-                                  message_content, re.IGNORECASE)
-    if general_filenames:
-        artifacts.extend([match[0].strip() for match in general_filenames if match[0].strip()])
-    
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_artifacts = []
-    for item in artifacts:
-        if item not in seen:
-            seen.add(item)
-            unique_artifacts.append(item)
-    
-    return unique_artifacts
+    # Without a dot there is nothing for the filename pattern to match, and
+    # str.__contains__ is far cheaper than a regex scan
+    if "." not in message_content:
+        return []
+
+    # One linear pass over the whole message. The old separate ARTIFACTS:
+    # section scan applied the same filename pattern to a substring of the
+    # text, so it only ever produced duplicates of the general pass; an
+    # insertion-ordered dict dedups while keeping first-seen order.
+    found = {}
+    for match in _FILENAME_RE.finditer(message_content):
+        name = match.group().strip()
+        if name:
+            found[name] = None
+    return list(found)
 
 
 def extract_reasoning_from_message(message_content: str) -> str:
@@ -131,14 +161,20 @@ def extract_reasoning_from_message(message_content: str) -> str:
     Returns:
         The reasoning text if found, empty string otherwise
     """
-    reasoning = ""
-    
-    # Look for the reasoning section
-    reasoning_match = re.search(r"REASONING:(.*?)(?:ARTIFACTS:|$)", message_content, re.DOTALL | re.IGNORECASE)
-    if reasoning_match:
-        reasoning = reasoning_match.group(1).strip()
-    
-    return reasoning
+    # Fast path: the agreed message format uses uppercase markers, so two
+    # C-level partition calls replace the regex scan entirely
+    _, sep, tail = message_content.partition("REASONING:")
+    if sep:
+        body, _, _ = tail.partition("ARTIFACTS:")
+        return body.strip()
+
+    # Case-insensitive fallback for messages that drift from the format;
+    # skip the regex when the marker is absent in any casing
+    if "reasoning:" not in message_content.casefold():
+        return ""
+
+    reasoning_match = _REASONING_RE.search(message_content)
+    return reasoning_match.group(1).strip() if reasoning_match else ""
 
 
 def process_agent_message(message, agent_state: dict) -> dict:
@@ -156,10 +192,13 @@ def process_agent_message(message, agent_state: dict) -> dict:
         # Extract artifacts
         artifacts = extract_artifacts_from_message(message.content)
         if artifacts:
-            agent_state["artifacts"].extend(artifacts)
-            # Remove duplicates while preserving order
-            seen = set()
-            agent_state["artifacts"] = [x for x in agent_state["artifacts"] if x not in seen and not seen.add(x)]
+            # Persistent seen-set: only the new items are checked, instead of
+            # re-deduplicating the whole accumulated list on every message
+            seen = agent_state.setdefault("_artifact_seen", set(agent_state["artifacts"]))
+            for artifact in artifacts:
+                if artifact not in seen:
+                    seen.add(artifact)
+                    agent_state["artifacts"].append(artifact)
         
         # Extract reasoning
         reasoning = extract_reasoning_from_message(message.content)
@@ -5,16 +5,86 @@ os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
 from pymilvus import connections, DataType
 from pymilvus import MilvusClient
 import numpy as np
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from tqdm import tqdm
 from config import BaseConfig
 from config import get_global_config
 
 from utils.get_attachments_metadata import get_all_metadata
-from tools.embeddings import image2vector, text2vector, get_embedding_dimensions
+from tools.embeddings import images2vectors, texts2vectors, get_embedding_dimensions
 
 base_cfg = get_global_config()
 
+# Extensions handled by the ingest walk, without the leading dot so the
+# suffix can come straight from name.rpartition('.')
+IMG_EXTS = frozenset({"jpg", "jpeg", "png"})
+TXT_EXTS = frozenset({"txt", "md"})
+
+# Metadata extraction is I/O bound; futures submitted as files enter a
+# batch let exiftool run behind the embedding passes and are resolved
+# only when the batch is flushed
+_metadata_executor = ThreadPoolExecutor(max_workers=8)
+
+# Metadata keyed on (path, mtime_ns): a file seen by both modality passes
+# or across resumed runs pays for exiftool once
+_meta_cache = {}
+
+def _cached_meta(path):
+    try:
+        key = (path, os.stat(path).st_mtime_ns)
+    except OSError:
+        return get_all_metadata(path)
+    value = _meta_cache.get(key)
+    if value is None:
+        value = get_all_metadata(path)
+        _meta_cache[key] = value
+    return value
+
+# Optional CPU-side text-embedding pool, enabled by setting embed_workers
+# > 1 in the config. Workers are spawned (not forked) so each loads its
+# own model with tokenizer parallelism re-enabled; the module-level
+# TOKENIZERS_PARALLELISM=false default only exists to quiet the forked-
+# process warning in the single-process path.
+_embed_pool = None
+
+def _init_embed_worker():
+    os.environ["TOKENIZERS_PARALLELISM"] = "true"
+    from tools.embeddings import get_text_model
+    get_text_model()
+
+def _embed_text_chunk(snippets):
+    from tools.embeddings import texts2vectors
+    return texts2vectors(snippets)
+
+def _get_embed_pool():
+    global _embed_pool
+    workers = base_cfg.get("embed_workers", 1)
+    if workers <= 1:
+        return None
+    if _embed_pool is None:
+        _embed_pool = multiprocessing.get_context("spawn").Pool(
+            workers, initializer=_init_embed_worker
+        )
+    return _embed_pool
+
+def _iter_files(root: str):
+    """Yield os.DirEntry objects for every file under root, recursively.
+
+    scandir reuses the metadata the directory read already returned, so
+    is_file/is_dir cost no extra stat per entry — unlike rglob, which
+    also builds a Path object per entry.
+    """
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_files(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                yield entry
+
 def create_collection(client, name: str, dim: int, logger=None):
     """Create a Milvus collection if it doesn't exist"""
     if logger:
@@ -46,67 +116,181 @@ def preprocess_data_to_milvus(logger=None):
     create_collection(client, IMAGE_COLL, DIM_IMAGE, logger)
     create_collection(client, TEXT_COLL, DIM_TEXT, logger)
 
+    # Manifest of paths already ingested (partially completed earlier run):
+    # embedding is the dominant cost, so skipping known files up front makes
+    # re-runs pay only for what is new
+    already_ingested = set()
+    for coll in (IMAGE_COLL, TEXT_COLL):
+        try:
+            rows = client.query(coll, filter="", output_fields=["path"], limit=16384)
+            already_ingested.update(row["path"] for row in rows)
+        except Exception as e:
+            if logger:
+                logger.warning("Could not read ingest manifest from %s: %s", coll, e)
+
     # ---------------- Bulk ingest ----------------
     DATA_ROOT = Path(base_cfg.get_path("attached_artifact_dir"))
-    BATCH_SIZE = 100
+    # Milvus insert throughput climbs well past 100-row batches; small
+    # frequent inserts also thrash the server-side index. Config-tunable
+    # for memory-constrained runs.
+    BATCH_SIZE = base_cfg.get("insert_batch_size", 1000)
+    # Files are embedded EMBED_BATCH at a time: one batched forward pass
+    # amortizes tokenization and kernel launches across the batch
+    EMBED_BATCH = 32
+
+    # Vectors accumulate into preallocated float32 arrays (structure-of-
+    # arrays): contiguous rows instead of a Python list of ndarrays, and a
+    # count reset instead of list churn on every flush. Capacity leaves
+    # headroom for the embed pass that may land just before a flush.
+    img_vectors = np.empty((BATCH_SIZE + EMBED_BATCH, DIM_IMAGE), dtype=np.float32)
+    txt_vectors = np.empty((BATCH_SIZE + EMBED_BATCH, DIM_TEXT), dtype=np.float32)
+    img_count = 0
+    txt_count = 0
+    img_batch = {"path": [], "meta": []}
+    txt_batch = {"path": [], "content": [], "meta": []}
+    pending_imgs = []  # paths awaiting an image-embedding pass
+    pending_txts = []  # (path, snippet) awaiting a text-embedding pass
 
-    img_batch = {"vector": [], "path": []}
-    txt_batch = {"vector": [], "path": [], "content": []}
+    def embed_pending_imgs():
+        nonlocal img_count
+        if not pending_imgs:
+            return
+        try:
+            vectors = images2vectors(pending_imgs, filter_icons=True)
+        except Exception as e:
+            logger.error(f"Failed to embed image batch ({len(pending_imgs)} files): {e}")
+            pending_imgs.clear()
+            return
+        for path, vec in zip(pending_imgs, vectors):
+            if vec is not None:
+                img_vectors[img_count] = vec
+                img_count += 1
+                img_batch["path"].append(path)
+                img_batch["meta"].append(_metadata_executor.submit(_cached_meta, path))
+        pending_imgs.clear()
+
+    def embed_pending_txts():
+        nonlocal txt_count
+        if not pending_txts:
+            return
+        snippets = [snippet for _, snippet in pending_txts]
+        try:
+            pool = _get_embed_pool()
+            if pool is not None:
+                chunk = max(1, len(snippets) // pool._processes)
+                chunks = [snippets[i:i + chunk] for i in range(0, len(snippets), chunk)]
+                vectors = np.vstack(pool.map(_embed_text_chunk, chunks))
+            else:
+                vectors = texts2vectors(snippets)
+        except Exception as e:
+            logger.error(f"Failed to embed text batch ({len(pending_txts)} files): {e}")
+            pending_txts.clear()
+            return
+        for (path, snippet), vec in zip(pending_txts, vectors):
+            txt_vectors[txt_count] = vec
+            txt_count += 1
+            txt_batch["path"].append(path)
+            txt_batch["content"].append(snippet)
+            txt_batch["meta"].append(_metadata_executor.submit(_cached_meta, path))
+        pending_txts.clear()
+
+    # Inserts go through a small bounded queue drained by a writer thread,
+    # overlapping Milvus network I/O with embedding work; the maxsize caps
+    # how many batches can pile up if the server falls behind
+    insert_q = queue.Queue(maxsize=4)
+
+    def _writer():
+        while True:
+            coll, rows = insert_q.get()
+            try:
+                client.insert(coll, rows)
+            except Exception as e:
+                logger.error(f"Failed to insert batch of {len(rows)} rows into {coll}: {e}")
+            finally:
+                insert_q.task_done()
+
+    threading.Thread(target=_writer, daemon=True).start()
 
     def flush_img():
-        if not img_batch["vector"]:
+        nonlocal img_count
+        if not img_count:
             return
 
+        # One bulk copy so the writer thread reads stable rows after the
+        # buffer is reused for the next batch
+        vecs = img_vectors[:img_count].copy()
         rows = [
-            {"vector": v, "path": p, "modality": "image", "content": "", "metadata": get_all_metadata(p)}
-            for v, p in zip(img_batch["vector"], img_batch["path"])
+            {"vector": vecs[i], "path": p, "modality": "image", "content": "", "metadata": m.result()}
+            for i, (p, m) in enumerate(zip(img_batch["path"], img_batch["meta"]))
         ]
-        client.insert(IMAGE_COLL, rows)
+        insert_q.put((IMAGE_COLL, rows))
+        img_count = 0
         for k in img_batch:
             img_batch[k].clear()
 
     def flush_txt():
-        if not txt_batch["vector"]:
+        nonlocal txt_count
+        if not txt_count:
             return
 
+        vecs = txt_vectors[:txt_count].copy()
         rows = [
-            {"vector": v, "path": p, "modality": "text", "content": c, "metadata": get_all_metadata(p)}
-            for v, p, c in zip(txt_batch["vector"], txt_batch["path"], txt_batch["content"])
+            {"vector": vecs[i], "path": p, "modality": "text", "content": c, "metadata": m.result()}
+            for i, (p, c, m) in enumerate(zip(txt_batch["path"], txt_batch["content"], txt_batch["meta"]))
         ]
-        client.insert(TEXT_COLL, rows)
+        insert_q.put((TEXT_COLL, rows))
+        txt_count = 0
         for k in txt_batch:
             txt_batch[k].clear()
 
-    def process_file(p: Path):
+    def process_file(entry):
+        path = entry.path
+        if path in already_ingested:
+            return
+        ext = entry.name.rpartition('.')[2].lower()
         try:
-            if p.suffix.lower() in {".jpg", ".jpeg", ".png"}:
-                vec = image2vector(str(p), filter_icons=True)
-                if vec is not None:
-                    img_batch["vector"].append(vec.astype(np.float32).tolist())
-                    img_batch["path"].append(str(p))
-            elif p.suffix.lower() in {".txt", ".md"}:
-                full_text = p.read_text(encoding="utf-8", errors="ignore")
-                snippet = full_text[:500]
-                vec = text2vector(snippet)
-                txt_batch["vector"].append(vec.astype(np.float32).tolist())
-                txt_batch["path"].append(str(p))
-                txt_batch["content"].append(snippet)
+            if ext in IMG_EXTS:
+                pending_imgs.append(path)
+            elif ext in TXT_EXTS:
+                # Only the first 500 chars are embedded, so read a bounded
+                # 2 KB head (enough to decode 500 chars) instead of pulling
+                # a possibly huge file into memory
+                fd = os.open(path, os.O_RDONLY)
+                try:
+                    raw = os.read(fd, 2048)
+                finally:
+                    os.close(fd)
+                pending_txts.append((path, raw.decode("utf-8", "ignore")[:500]))
         except Exception as e:
-            logger.error(f"Failed to ingest {p}: {e}")
-
-    files = [f for f in DATA_ROOT.rglob("*") if f.is_file()]
-    for f in tqdm(files, desc="Embedding & uploading"):
-        process_file(f)
-        if len(img_batch["vector"]) >= BATCH_SIZE:
-            flush_img()
-        if len(txt_batch["vector"]) >= BATCH_SIZE:
-            flush_txt()
+            logger.error(f"Failed to ingest {path}: {e}")
 
-    flush_img()
-    flush_txt()
+    # client.flush must happen exactly once per collection, after every
+    # batch is queued and drained: per-batch flushes force Milvus to seal
+    # tiny segments and churn the index, backing up ingestion. Keep the
+    # only flush calls in the finally block below.
+    try:
+        # Stream entries straight from the walk instead of materializing a list
+        for f in tqdm(_iter_files(str(DATA_ROOT)), desc="Embedding & uploading"):
+            process_file(f)
+            if len(pending_imgs) >= EMBED_BATCH:
+                embed_pending_imgs()
+            if len(pending_txts) >= EMBED_BATCH:
+                embed_pending_txts()
+            if img_count >= BATCH_SIZE:
+                flush_img()
+            if txt_count >= BATCH_SIZE:
+                flush_txt()
 
-    client.flush(IMAGE_COLL)
-    client.flush(TEXT_COLL)
+        embed_pending_imgs()
+        embed_pending_txts()
+        flush_img()
+        flush_txt()
+    finally:
+        # Drain the writer thread, then flush once so whatever made it in
+        # is sealed and countable even if the walk aborted partway
+        insert_q.join()
+        client.flush(IMAGE_COLL)
+        client.flush(TEXT_COLL)
 
     img_count = int(client.get_collection_stats(IMAGE_COLL)["row_count"])
     txt_count = int(client.get_collection_stats(TEXT_COLL)["row_count"])
@@ -0,0 +1,111 @@
+"""
+In-process LRU + TTL cache for Milvus vector-search results.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class QueryCache:
+    """LRU + TTL cache for vector-search results with a semantic fallback.
+
+    Exact lookups are keyed on the full search-parameter tuple. When the
+    exact key misses but the caller has already embedded the query, the
+    most recent cached vectors with the same search parameters are compared
+    against it — the vectors are normalized, so cosine similarity is a dot
+    product — and a near-duplicate (similarity above the threshold) reuses
+    the cached results without a Milvus round trip.
+
+    Writers should call invalidate(collection_name); the per-collection
+    generation counter is folded into every key, so entries from before a
+    write can never match again.
+    """
+
+    def __init__(self, max_size: int = 2000, ttl_seconds: float = 300,
+                 similarity_threshold: float = 0.97, scan_window: int = 64):
+        self._data = OrderedDict()  # key -> (timestamp, vector, results)
+        self._lock = threading.RLock()
+        self._max_size = max_size
+        self._ttl = ttl_seconds
+        self._similarity_threshold = similarity_threshold
+        self._scan_window = scan_window
+        self._generations = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def generation(self, collection_name: str) -> int:
+        """Current generation for a collection; include it in cache keys."""
+        with self._lock:
+            return self._generations.get(collection_name, 0)
+
+    def invalidate(self, collection_name: str) -> None:
+        """Bump the collection's generation so existing entries stop matching."""
+        with self._lock:
+            self._generations[collection_name] = self._generations.get(collection_name, 0) + 1
+
+    def get_exact(self, key):
+        """Return cached results for the exact key, or None.
+
+        A miss here is not counted: the caller is expected to follow up
+        with get_similar once the query vector is available.
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            timestamp, _vector, results = item
+            if time.monotonic() - timestamp > self._ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return results
+
+    def get_similar(self, key, query_vector) -> object:
+        """Return results cached under a near-identical vector, or None.
+
+        Only entries whose key shares every field except the query text
+        (key[:-1]) are candidates; at most scan_window of the most recent
+        ones are compared.
+        """
+        params = key[:-1]
+        now = time.monotonic()
+        with self._lock:
+            scanned = 0
+            for other_key in reversed(self._data):
+                if scanned >= self._scan_window:
+                    break
+                if other_key[:-1] != params:
+                    continue
+                scanned += 1
+                timestamp, vector, results = self._data[other_key]
+                if now - timestamp > self._ttl or vector is None:
+                    continue
+                if float(np.dot(vector, query_vector)) > self._similarity_threshold:
+                    self.hits += 1
+                    return results
+            self.misses += 1
+            return None
+
+    def put(self, key, query_vector, results) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic(), query_vector, results)
+            self._data.move_to_end(key)
+            while len(self._data) > self._max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "max_size": self._max_size,
+                "ttl_seconds": self._ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }